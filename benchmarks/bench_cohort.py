@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Cohort Benchmark - Ingest, incremental re-ranking and full report time for a synthetic department
+
+Builds course lists for N students from the synthetic transcript vocabulary (see synthetic.py) without writing
+PDFs, loads them into a transcript_cohort.Cohort and times adding one more transcript followed by a re-rank.
+Every student's GPA and a sample of grade counts are checked against calculate_gpa / a plain loop; any
+difference makes the run exit with status 1.
+
+Usage:
+    python benchmarks/bench_cohort.py [--students 20000] [--seed 0]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from synthetic import COURSES, GRADES, SEASONS
+from transcript_cohort import Cohort
+from transcript_engine import calculate_gpa
+
+
+def student_courses(rng):
+    courses, start = [], rng.randint(0, 5)
+    for code, name in rng.sample(COURSES, rng.randint(8, len(COURSES))):
+        i = start + rng.randint(0, 11)
+        year = 2015 + i // 3
+        courses.append({"semester": f"{year}-{year + 1} Yılı {SEASONS[i % 3]} Dönemi", "code": code, "name": name,
+                        "credits": rng.randint(1, 5), "grade": rng.choice(GRADES)})
+    return courses
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cohort analytics on synthetic students.")
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    students = {f"{290000000 + i}": student_courses(rng) for i in range(args.students)}
+    cohort = Cohort()
+
+    start = time.perf_counter()
+    for student_id, courses in students.items(): cohort.add(student_id, courses)
+    ingest = time.perf_counter() - start
+
+    newcomer = student_courses(rng)
+    start = time.perf_counter()
+    cohort.add("newcomer", newcomer)
+    ranking = cohort.ranking()
+    incremental = time.perf_counter() - start
+    students["newcomer"] = newcomer
+
+    _, loop = timed(lambda: sorted(((g, s) for s, c in students.items() for g in [calculate_gpa(c)[0]] if g is not None), reverse=True))
+    _, curves = timed(cohort.semester_curves)
+    _, report = timed(cohort.report)
+
+    failures = 0
+    gpa = dict(zip(ranking.student_ids, ranking.gpa))
+    for student_id, courses in students.items():
+        expected = calculate_gpa(courses)[0]
+        got = gpa.get(student_id)
+        if (expected is None) != (got is None) or (expected is not None and abs(expected - got) > 1e-9): failures += 1
+    counts = Counter((c["code"], c["grade"]) for courses in students.values() for c in courses)
+    distribution = cohort.grade_distribution()
+    failures += sum(distribution.get(code, {}).get(grade, 0) != n for (code, grade), n in counts.items())
+
+    print(f"students                  {len(cohort):>10}")
+    print(f"ingest (all students)     {ingest:>9.3f}s  {1e6 * ingest / len(cohort):.1f} us/student")
+    print(f"add one + re-rank         {1000 * incremental:>9.2f}ms")
+    print(f"rank via calculate_gpa    {1000 * loop:>9.2f}ms")
+    print(f"semester curves           {1000 * curves:>9.2f}ms")
+    print(f"full report               {1000 * report:>9.2f}ms")
+    print(f"mismatches                {failures:>10}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Extraction Benchmark - Two cropped extract_text calls vs. one pass over page.chars
+
+Usage:
+    python benchmarks/bench_extraction.py transcript.pdf [more.pdf ...] [-r 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import pdfplumber
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from transcript_engine import extract_columns
+
+
+def extract_cropped(page):
+    # Previous approach: hard-coded centre split and two independent layout passes
+    mid_x = page.width / 2
+    left_text = page.crop((0, 0, mid_x, page.height)).extract_text() or ""
+    right_text = page.crop((mid_x, 0, page.width, page.height)).extract_text() or ""
+    return left_text, right_text
+
+
+def run(filepath, extract, trace=False):
+    # Returns (seconds, peak traced bytes, texts) for the column split alone
+    with pdfplumber.open(filepath) as pdf:
+        # pdfminer character parsing is shared by both approaches, so it is kept out of the measurement
+        for page in pdf.pages: page.chars
+        if trace: tracemalloc.start()
+        start = time.perf_counter()
+        texts = [extract(page) for page in pdf.pages]
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace else 0
+        if trace: tracemalloc.stop()
+    return elapsed, peak, texts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare cropped and single-pass column extraction.")
+    parser.add_argument("pdfs", nargs="+")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'file':<32} {'pages':>5} {'cropped s':>10} {'single s':>10} {'speedup':>8} {'cropped MB':>11} {'single MB':>10}  same")
+    for filepath in args.pdfs:
+        results = {}
+        # fast=False: both sides read the preloaded page.chars (transcript_fastpath has its own benchmark)
+        for name, extract in (("cropped", extract_cropped), ("single", lambda page: extract_columns(page, fast=False))):
+            runs = [run(filepath, extract) for _ in range(args.repeat)]
+            results[name] = (min(r[0] for r in runs), run(filepath, extract, trace=True)[1], runs[0][2])
+        (t_old, m_old, old), (t_new, m_new, new) = results["cropped"], results["single"]
+        print(f"{os.path.basename(filepath)[:32]:<32} {len(old):>5} {t_old:>10.3f} {t_new:>10.3f} {t_old / t_new:>7.2f}x "
+              f"{m_old / 2**20:>11.1f} {m_new / 2**20:>10.1f}  {'yes' if old == new else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
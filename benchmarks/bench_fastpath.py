@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Fast Path Benchmark - Per-page column extraction through transcript_fastpath vs. pdfplumber's page.chars
+
+Times extract_columns (char extraction, gutter split and textmap) on fresh pages through both backends and checks
+that every page yields exactly the same column text. Without arguments it runs on synthetic transcripts
+(see synthetic.py); any difference makes the run exit with status 1.
+
+Usage:
+    python benchmarks/bench_fastpath.py [transcript.pdf ...] [-r 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import pdfplumber
+from synthetic import build_pdf
+from transcript_engine import extract_columns
+
+SYNTHETIC_SIZES = [1, 5, 20, 100]
+
+
+def run(filepath, fast):
+    # Returns (seconds, page count, column texts); the PDF is reopened so no page caches are shared
+    with pdfplumber.open(filepath) as pdf:
+        start = time.perf_counter()
+        texts = []
+        for page in pdf.pages:
+            texts.append(extract_columns(page, fast=fast))
+            page.close()
+        return time.perf_counter() - start, len(texts), texts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare fast-path and pdfplumber column extraction.")
+    parser.add_argument("pdfs", nargs="*", help="PDFs to measure (default: synthetic transcripts)")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="runs per backend (best is reported)")
+    args = parser.parse_args(argv)
+
+    failures, slow_total, fast_total, page_total = 0, 0.0, 0.0, 0
+    with tempfile.TemporaryDirectory() as tmp:
+        pdfs = args.pdfs or [build_pdf(os.path.join(tmp, f"synthetic_{n}p.pdf"), n, seed=n) for n in SYNTHETIC_SIZES]
+        print(f"{'file':<32} {'pages':>5} {'pdfplumber ms/page':>19} {'fast ms/page':>13} {'speedup':>8}  same")
+        for filepath in pdfs:
+            slow = min((run(filepath, False) for _ in range(args.repeat)), key=lambda r: r[0])
+            fast = min((run(filepath, True) for _ in range(args.repeat)), key=lambda r: r[0])
+            same = slow[2] == fast[2]
+            if not same: failures += 1
+            pages = slow[1] or 1
+            slow_total, fast_total, page_total = slow_total + slow[0], fast_total + fast[0], page_total + slow[1]
+            print(f"{os.path.basename(filepath)[:32]:<32} {slow[1]:>5} {1000 * slow[0] / pages:>19.2f} {1000 * fast[0] / pages:>13.2f} "
+                  f"{slow[0] / fast[0]:>7.2f}x  {'yes' if same else 'NO'}")
+    if fast_total:
+        print(f"{'all':<32} {page_total:>5} {1000 * slow_total / page_total:>19.2f} {1000 * fast_total / page_total:>13.2f} "
+              f"{slow_total / fast_total:>7.2f}x")
+
+    if failures:
+        print(f"{failures} file(s) extract differently through the fast path.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Parser Benchmark - Throughput, stage timings, peak RSS and golden-corpus check
+
+Generates synthetic UBYS-style transcripts (see synthetic.py) at 1, 5, 20 and 100 pages, parses each one in a
+fresh subprocess and reports pages/sec, time spent in text extraction (character parsing and column split, through
+the fast path unless TRANSCRIPT_EXTRACTION=pdfplumber is set) vs. the regex tokenizer and retake resolution, and
+the peak RSS of that process. Every result is compared against
+benchmarks/golden/; any difference makes the run exit with status 1.
+
+Usage:
+    python benchmarks/bench_parser.py [--sizes 1 5 20 100] [--repeat 3]
+    python benchmarks/bench_parser.py --update-golden    # after an intended change in parser output
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(BENCH_DIR, "golden")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import pdfplumber
+from synthetic import build_pdf
+from transcript_engine import extract_columns, process_column, resolve_courses
+
+DEFAULT_SIZES = [1, 5, 20, 100]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def parse_once(filepath):
+    # Mirrors engine.iter_sections + parse_pdf, with a timer around each stage
+    pdf_time = regex_time = 0.0
+    raw = []
+    with pdfplumber.open(filepath) as pdf:
+        for page in pdf.pages:
+            start = time.perf_counter()
+            left_text, right_text = extract_columns(page)
+            page.close()
+            middle = time.perf_counter()
+            for section in process_column(left_text) + process_column(right_text):
+                raw.extend(section["courses"])
+            regex_time += time.perf_counter() - middle
+            pdf_time += middle - start
+        pages = len(pdf.pages)
+    start = time.perf_counter()
+    courses = resolve_courses(raw)
+    regex_time += time.perf_counter() - start
+    return pages, pdf_time, regex_time, raw, courses
+
+
+def golden_record(raw, courses):
+    raw_json = json.dumps(raw, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return {"raw_course_count": len(raw), "raw_sha256": hashlib.sha256(raw_json).hexdigest(), "courses": courses}
+
+
+def run_child(filepath, repeat):
+    # Entry point of the per-size subprocess; prints one JSON line
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages, pdf_time, regex_time, raw, courses = parse_once(filepath)
+        total = time.perf_counter() - start
+        if best is None or total < best["total"]:
+            best = {"pages": pages, "total": total, "pdf": pdf_time, "regex": regex_time}
+    best["rss_mb"] = peak_rss_mb()
+    best["golden"] = golden_record(raw, courses)
+    print(json.dumps(best, ensure_ascii=False))
+
+
+def golden_path(pages):
+    return os.path.join(GOLDEN_DIR, f"synthetic_{pages}p.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the transcript parser on synthetic PDFs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="page counts to generate")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size (best is reported)")
+    parser.add_argument("--update-golden", action="store_true", help="rewrite the golden files from this run")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child, args.repeat)
+        return 0
+
+    failures = 0
+    print(f"{'pages':>5} {'total s':>8} {'pages/s':>8} {'extract s':>13} {'regex s':>8} {'regex %':>8} {'peak RSS MB':>12}  golden")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.sizes:
+            # The seed equals the page count, so every size always produces the same document
+            filepath = build_pdf(os.path.join(tmp, f"synthetic_{pages}p.pdf"), pages, seed=pages)
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", filepath, "--repeat", str(args.repeat)],
+                                 capture_output=True, text=True, encoding="utf-8", check=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+
+            path = golden_path(pages)
+            if args.update_golden:
+                os.makedirs(GOLDEN_DIR, exist_ok=True)
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(result["golden"], f, ensure_ascii=False, indent=1)
+                    f.write("\n")
+                status = "updated"
+            elif not os.path.exists(path):
+                status = "missing"
+                failures += 1
+            else:
+                with open(path, encoding="utf-8") as f:
+                    status = "ok" if json.load(f) == result["golden"] else "MISMATCH"
+                if status != "ok": failures += 1
+
+            rss = f"{result['rss_mb']:.1f}" if result["rss_mb"] is not None else "n/a"
+            print(f"{result['pages']:>5} {result['total']:>8.3f} {result['pages'] / result['total']:>8.1f} {result['pdf']:>13.3f} "
+                  f"{result['regex']:>8.3f} {100 * result['regex'] / result['total']:>7.1f}% {rss:>12}  {status}")
+
+    if failures:
+        print(f"{failures} size(s) differ from the golden corpus; run with --update-golden only if the change is intended.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
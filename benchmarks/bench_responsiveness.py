@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Responsiveness Check - Event-loop tick gaps while a PDF is parsed
+
+Parses a PDF (a generated 100-page synthetic transcript unless one is given) three times: inline in a loop
+callback (the old upload_pdf behaviour), with BackgroundParse polled through after(), and through the real
+ModernTranscriptApp (upload_pdf, poll_parse and the live table preview). A ticker scheduled every --tick ms records
+how late the loop gets to it. Exits with status 1 if a background or app run ever stalls longer than --max-gap ms.
+
+Without a display the app run is skipped and the other two run on a plain timer loop with the same after()
+interface, which still catches a worker thread that starves the main thread of the GIL.
+
+Usage:
+    python benchmarks/bench_responsiveness.py [transcript.pdf] [--tick 10] [--max-gap 100]
+"""
+
+import argparse
+import heapq
+import os
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+from synthetic import build_pdf
+from transcript_engine import BackgroundParse, load_courses
+
+POLL_MS = 50
+SYNTHETIC_PAGES = 100
+
+
+class TimerLoop:
+    # Stand-in for Tk's after()/mainloop()/quit() when there is no display
+    def __init__(self):
+        self.timers, self.seq, self.running = [], 0, False
+
+    def after(self, ms, callback):
+        self.seq += 1
+        heapq.heappush(self.timers, (time.perf_counter() + ms / 1000, self.seq, callback))
+
+    def mainloop(self):
+        self.running = True
+        while self.running and self.timers:
+            due, _, callback = heapq.heappop(self.timers)
+            delay = due - time.perf_counter()
+            if delay > 0: time.sleep(delay)
+            callback()
+
+    def quit(self):
+        self.running = False
+
+
+def measure(root, tick_ms, start):
+    # start(finish) begins the work and calls finish() once it is over
+    ticks, state = [time.perf_counter()], {"running": True}
+
+    def tick():
+        ticks.append(time.perf_counter())
+        if state["running"]: root.after(tick_ms, tick)
+
+    def finish():
+        # The gap up to the end counts too, or a run that blocks the loop throughout would show no ticks at all
+        ticks.append(time.perf_counter())
+        state["running"] = False
+        root.quit()
+
+    root.after(tick_ms, tick)
+    root.after(0, lambda: start(finish))
+    started = time.perf_counter()
+    root.mainloop()
+    elapsed = time.perf_counter() - started
+    gaps = sorted((b - a) * 1000 for a, b in zip(ticks, ticks[1:]))
+    return elapsed, len(ticks) - 1, gaps[int(len(gaps) * 0.95) - 1] if gaps else 0, gaps[-1] if gaps else 0
+
+
+def inline_run(root, filepath):
+    def start(finish):
+        load_courses(filepath)
+        finish()
+    return start
+
+
+def background_run(root, filepath):
+    def start(finish):
+        job = BackgroundParse(filepath)
+
+        def poll():
+            while not job.events.empty():
+                if job.events.get()[0] in ("done", "cancelled", "error"):
+                    finish()
+                    return
+            root.after(POLL_MS, poll)
+        poll()
+    return start
+
+
+def app_run(app, filepath):
+    import transcript_calculator
+
+    def start(finish):
+        # No parse cache, so the second run parses again; the file dialog returns the PDF directly
+        app.cache_opened, app.cache = True, None
+        transcript_calculator.filedialog.askopenfilename = lambda **kwargs: filepath
+        app.upload_pdf()
+
+        def wait():
+            if app.parse_job is None: finish()
+            else: app.after(POLL_MS, wait)
+        wait()
+    return start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure event-loop responsiveness during a PDF parse.")
+    parser.add_argument("pdf", nargs="?", help=f"transcript to parse (default: a generated {SYNTHETIC_PAGES}-page one)")
+    parser.add_argument("--tick", type=int, default=10, help="ticker interval in ms")
+    parser.add_argument("--max-gap", type=float, default=100, help="largest acceptable tick gap in ms for the background and app runs")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = args.pdf or build_pdf(os.path.join(tmp, f"synthetic_{SYNTHETIC_PAGES}p.pdf"), SYNTHETIC_PAGES, seed=SYNTHETIC_PAGES)
+        try:
+            root = tk.Tk()
+            root.withdraw()
+        except tk.TclError as e:
+            print(f"No display ({e}); timing a plain timer loop and skipping the app run")
+            root = None
+
+        runs = [("inline", inline_run), ("background", background_run)]
+        if root is not None: runs.append(("app", app_run))
+        print(f"{'mode':<12} {'parse s':>8} {'ticks':>6} {'p95 gap ms':>11} {'max gap ms':>11}")
+        worst_gap = 0
+        for name, run in runs:
+            if name == "app":
+                root.destroy()
+                import transcript_calculator
+                root = transcript_calculator.ModernTranscriptApp()
+                root.withdraw()
+            loop = root if root is not None else TimerLoop()
+            elapsed, count, p95, worst = measure(loop, args.tick, run(loop, filepath))
+            print(f"{name:<12} {elapsed:>8.2f} {count:>6} {p95:>11.1f} {worst:>11.1f}")
+            if name != "inline": worst_gap = max(worst_gap, worst)
+        if root is not None: root.destroy()
+
+    if worst_gap > args.max_gap:
+        print(f"FAIL: event loop stalled for {worst_gap:.1f} ms (limit {args.max_gap:.0f} ms)")
+        return 1
+    print("OK: event loop kept ticking during the background parse")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
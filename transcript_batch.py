@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Transcript Batch - Headless parsing of many transcript PDFs on a process pool
+
+Usage:
+    python transcript_batch.py transcripts/ "archive/2024*/*.pdf" -w 8 -f csv -o cohort.csv
+    python transcript_batch.py transcripts/ --no-cache --profile profile.json -o /dev/null   # stage histograms
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from transcript_cache import ParseCache, default_cache_path
+from transcript_engine import PARSER_VERSION, parse_transcript
+from transcript_trace import ParseTrace, TraceHistogram
+
+CSV_FIELDS = ["file", "student_id", "gpa", "gpa_all_attempts", "credits", "course_count", "retaken_count", "courses", "warnings", "error"]
+
+
+def collect_pdfs(targets):
+    # Directories are scanned recursively, anything else is treated as a glob
+    seen, files = set(), []
+    for target in targets:
+        if os.path.isdir(target):
+            matches = glob.glob(os.path.join(target, "**", "*.pdf"), recursive=True)
+            matches += glob.glob(os.path.join(target, "**", "*.PDF"), recursive=True)
+        else:
+            matches = glob.glob(target, recursive=True)
+        for path in sorted(matches):
+            if os.path.isfile(path) and path not in seen:
+                seen.add(path)
+                files.append(path)
+    return files
+
+
+# Per-process cache connection and profiling switch, set by the pool initializer
+_worker_cache = None
+_worker_profile = False
+
+
+def init_worker(cache_path, profile=False):
+    global _worker_cache, _worker_profile
+    if cache_path: _worker_cache = ParseCache(PARSER_VERSION, cache_path)
+    _worker_profile = profile
+
+
+def parse_in_worker(path):
+    if not _worker_profile: return parse_transcript(path, _worker_cache)
+    # Only the summary travels back to the parent, under a "trace" key that main() strips before writing
+    trace = ParseTrace(path)
+    record = parse_transcript(path, _worker_cache, trace)
+    record["trace"] = trace.summary()
+    return record
+
+
+def error_record(path, message):
+    return {"file": path, "student_id": None, "gpa": None, "gpa_all_attempts": None, "credits": 0, "courses": [], "retakes": {},
+            "warnings": [], "error": message}
+
+
+def iter_records(files, workers=None, cache_path=None, profile=False):
+    # Keeps a bounded window of pending futures so memory stays flat on huge cohorts. A worker that dies (e.g.
+    # killed by the OS) breaks the whole pool: it is replaced and the files it still held are retried one at a
+    # time, so only a file that crashes again gets an error record.
+    workers = workers or os.cpu_count() or 1
+    window = workers * 4
+    new_pool = lambda: ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(cache_path, profile))
+    pool, pending, retry = new_pool(), {}, deque()  # future -> (path, suspect)
+    files = iter(files)
+    try:
+        while True:
+            broken = False
+            while len(pending) < window:
+                if retry:
+                    # Files of a crashed pool run alone, so a second crash points at the file that causes it
+                    if pending: break
+                    job = retry.popleft()
+                else:
+                    path = next(files, None)
+                    if path is None: break
+                    job = (path, False)
+                try:
+                    pending[pool.submit(parse_in_worker, job[0])] = job
+                except BrokenProcessPool:
+                    # The pool broke after the futures seen so far completed normally
+                    retry.appendleft((job[0], True))
+                    broken = True
+                    break
+                if job[1]: break
+            if not pending and not retry: return
+
+            done = wait(pending, return_when=FIRST_COMPLETED)[0] if pending else set()
+            if broken or any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+                # The broken pool fails every job it still had; collect all of them before starting a fresh pool
+                done, _ = wait(pending)
+                pool.shutdown(wait=False)
+                pool = new_pool()
+
+            for future in done:
+                path, suspect = pending.pop(future)
+                try:
+                    yield future.result()
+                except BrokenProcessPool:
+                    if not suspect:
+                        retry.append((path, True))
+                        continue
+                    yield error_record(path, "worker process crashed")
+                except Exception as e:
+                    yield error_record(path, f"{type(e).__name__}: {e}")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class JsonWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+class CsvWriter:
+    def __init__(self, stream):
+        self.stream = stream
+        self.writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS)
+        self.writer.writeheader()
+
+    def write(self, record):
+        self.writer.writerow({
+            "file": record["file"],
+            "student_id": record["student_id"],
+            "gpa": "" if record["gpa"] is None else f"{record['gpa']:.2f}",
+            "gpa_all_attempts": "" if record["gpa_all_attempts"] is None else f"{record['gpa_all_attempts']:.2f}",
+            "credits": record["credits"],
+            "course_count": len(record["courses"]),
+            "retaken_count": len(record["retakes"]),
+            "courses": json.dumps(record["courses"], ensure_ascii=False),
+            "warnings": "; ".join(record["warnings"]),
+            "error": record["error"] or "",
+        })
+        self.stream.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse transcript PDFs in bulk and stream one record per student.")
+    parser.add_argument("targets", nargs="+", help="PDF files, directories or glob patterns")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("-f", "--format", choices=["json", "csv"], default="json", help="output format (json = one object per line)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--cache", default=default_cache_path(), help="parse cache database (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="always re-parse, bypassing the cache")
+    parser.add_argument("--profile", metavar="PATH", help="write per-stage timing histograms and parse counters (JSON) to PATH")
+    args = parser.parse_args(argv)
+
+    files = collect_pdfs(args.targets)
+    if not files:
+        print("No PDF files found.", file=sys.stderr)
+        return 1
+
+    stream = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    writer = CsvWriter(stream) if args.format == "csv" else JsonWriter(stream)
+    failed = 0
+    histogram = TraceHistogram() if args.profile else None
+    try:
+        for record in iter_records(files, args.workers, None if args.no_cache else args.cache, bool(args.profile)):
+            if record["error"]: failed += 1
+            trace = record.pop("trace", None)
+            if histogram and trace: histogram.add(trace)
+            writer.write(record)
+    finally:
+        if stream is not sys.stdout: stream.close()
+
+    if histogram:
+        with open(args.profile, "w", encoding="utf-8") as f:
+            json.dump(histogram.report(), f, ensure_ascii=False, indent=1)
+
+    print(f"{len(files)} files processed, {failed} failed.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
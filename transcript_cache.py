@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Transcript Cache - Content-addressed on-disk cache for parsed transcripts
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def default_cache_path():
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "iyte-transcript-calculator", "parse_cache.sqlite3")
+
+
+def file_digest(filepath):
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ParseCache:
+    # Entries are keyed by (sha256 of the PDF bytes, parser version) and evicted least-recently-used
+    def __init__(self, version, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.version = str(version)
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        if self.path != ":memory:": os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS entries (
+                digest TEXT NOT NULL, version TEXT NOT NULL, payload BLOB NOT NULL,
+                size INTEGER NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (digest, version))""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+            # Running size total, kept by triggers in the same transaction as every insert/delete (from any process),
+            # so eviction does not have to scan the table on each put
+            self.conn.execute("CREATE TABLE IF NOT EXISTS stats (id INTEGER PRIMARY KEY CHECK (id = 1), total INTEGER NOT NULL)")
+            self.conn.execute("CREATE TRIGGER IF NOT EXISTS entries_added AFTER INSERT ON entries BEGIN UPDATE stats SET total = total + NEW.size; END")
+            self.conn.execute("CREATE TRIGGER IF NOT EXISTS entries_removed AFTER DELETE ON entries BEGIN UPDATE stats SET total = total - OLD.size; END")
+            # A parser version bump makes every older entry unreachable, so drop them right away
+            self.conn.execute("DELETE FROM entries WHERE version != ?", (self.version,))
+            # Recounted once per open, which also fills it in for caches written before it existed
+            self.conn.execute("INSERT OR REPLACE INTO stats VALUES (1, (SELECT COALESCE(SUM(size), 0) FROM entries))")
+
+    def get(self, digest):
+        try:
+            row = self.conn.execute("SELECT payload FROM entries WHERE digest = ? AND version = ?", (digest, self.version)).fetchone()
+            if row is None: return None
+            with self.conn:
+                self.conn.execute("UPDATE entries SET last_used = ? WHERE digest = ? AND version = ?", (time.time(), digest, self.version))
+            return json.loads(zlib.decompress(row[0]))
+        except (sqlite3.Error, zlib.error, ValueError):
+            return None
+
+    def put(self, digest, value):
+        payload = zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        try:
+            with self.conn:
+                # Not INSERT OR REPLACE: its implicit delete would not fire the size trigger
+                self.conn.execute("DELETE FROM entries WHERE digest = ? AND version = ?", (digest, self.version))
+                self.conn.execute("INSERT INTO entries VALUES (?, ?, ?, ?, ?)", (digest, self.version, payload, len(payload), time.time()))
+                self.evict()
+        except sqlite3.Error:
+            pass
+
+    def evict(self):
+        total = self.conn.execute("SELECT total FROM stats").fetchone()[0]
+        if total <= self.max_bytes: return
+        freed, stale = 0, []
+        for digest, version, size in self.conn.execute("SELECT digest, version, size FROM entries ORDER BY last_used"):
+            if total - freed <= self.max_bytes: break
+            stale.append((digest, version))
+            freed += size
+        self.conn.executemany("DELETE FROM entries WHERE digest = ? AND version = ?", stale)
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM entries")
+
+    def close(self):
+        self.conn.close()
@@ -3,27 +3,43 @@
 Transcript Calculator - Modern UI Version with Multi-language Support
 """
 
+import os
+import sys
+import time
+
+# Startup Timing: python transcript_calculator.py --startup-report (or TRANSCRIPT_STARTUP_REPORT=1 for the .exe).
+# For a per-module breakdown of the import phase, run with python -X importtime as well.
+STARTUP_REPORT = "--startup-report" in sys.argv or bool(os.environ.get("TRANSCRIPT_STARTUP_REPORT"))
+STARTUP_MARKS = [("module start", time.perf_counter())]
+
+def mark_startup(label):
+    if STARTUP_REPORT: STARTUP_MARKS.append((label, time.perf_counter()))
+
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkinter import ttk
-import pdfplumber
-import re
+mark_startup("import customtkinter/tkinter")
+import queue
+import sqlite3
+import tempfile
+# The engine imports pdfplumber lazily; it is prewarmed in the background after the first frame
+import transcript_engine
+from transcript_engine import GRADE_POINTS, GPA_EXCLUDED_GRADES
+from transcript_cache import ParseCache
+from transcript_store import Course, TranscriptStore
+mark_startup("import engine")
 
 # Appearance Settings
 ctk.set_appearance_mode("Dark")
 BURGUNDY = "#9A1220"
 BURGUNDY_HOVER = "#7A0E18"
 
-# Grade Point Scaling
-GRADE_POINTS = {
-    "AA": 4.00, "BA": 3.50, "BB": 3.00, "CB": 2.50, "CC": 2.00,
-    "DC": 1.50, "DD": 1.00, "FD": 0.50, "FF": 0.00, "NA": 0.00,
-    "I": 0.00, "S": 0.00, "U": 0.00, "W": 0.00, "NI": 0.00, "EX": 0.00,
-}
+# Background parse polling interval (ms)
+PARSE_POLL_MS = 50
 
-# Grades excluded from GPA calculation
-GPA_EXCLUDED_GRADES = {"NA", "I", "S", "U", "W", "NI", "EX", ""}
+# Delay after the first frame before pdfplumber is imported in the background (ms)
+PREWARM_DELAY_MS = 300
 
 # Localization Dictionary
 LANGUAGES = {
@@ -33,9 +49,12 @@ LANGUAGES = {
         "btn_upload": "Load PDF",
         "btn_add": "Add New Course",
         "btn_delete": "Delete Selected",
+        "btn_save_session": "Save Session",
+        "btn_open_session": "Open Session",
         "appearance_mode": "Appearance Mode:",
         "language_mode": "Language:",
         "gpa_title": "Current GPA",
+        "gpa_all_attempts": "All attempts",
         "credits_title": "Total Credits",
         "hint": "💡 Tip: Double-click any cell to edit course data.",
         "col_semester": "Semester",
@@ -52,11 +71,19 @@ LANGUAGES = {
         "edit_title": "Edit Value",
         "save": "Save",
         "cancel": "Cancel",
+        "open": "Open",
+        "session_title": "Saved Sessions",
+        "session_name": "Session name:",
+        "session_saved": "Session saved.",
+        "no_sessions": "No saved sessions yet.",
+        "error_store": "Session store error",
+        "parsing": "Reading page",
         "enter_info": "Enter Course Info",
         "placeholder_semester": "Semester (e.g., 2023-2024 Fall)",
         "placeholder_code": "Course Code",
         "placeholder_name": "Course Name",
         "placeholder_credits": "Credits",
+        "placeholder_filter": "Filter by semester, course code or grade",
         "grading_scale": "Grading Scale: AA=4.00 | BA=3.50 | BB=3.00 | CB=2.50 | CC=2.00 | DC=1.50 | DD=1.00 | FD=0.50 | FF=0.00"
     },
     "Türkçe": {
@@ -65,9 +92,12 @@ LANGUAGES = {
         "btn_upload": "PDF Yükle",
         "btn_add": "Yeni Ders Ekle",
         "btn_delete": "Seçiliyi Sil",
+        "btn_save_session": "Oturumu Kaydet",
+        "btn_open_session": "Oturum Aç",
         "appearance_mode": "Görünüm Modu:",
         "language_mode": "Dil:",
         "gpa_title": "Genel Ortalama (GNO)",
+        "gpa_all_attempts": "Tüm denemeler",
         "credits_title": "Toplam Kredi",
         "hint": "💡 İpucu: Hücrelere çift tıklayarak verileri düzenleyebilirsiniz.",
         "col_semester": "Ders Dönemi",
@@ -84,25 +114,253 @@ LANGUAGES = {
         "edit_title": "Düzenle",
         "save": "Kaydet",
         "cancel": "İptal",
+        "open": "Aç",
+        "session_title": "Kayıtlı Oturumlar",
+        "session_name": "Oturum adı:",
+        "session_saved": "Oturum kaydedildi.",
+        "no_sessions": "Henüz kayıtlı oturum yok.",
+        "error_store": "Oturum veritabanı hatası",
+        "parsing": "Okunan sayfa",
         "enter_info": "Ders Bilgilerini Girin",
         "placeholder_semester": "Dönem (Örn: 2023-2024 Güz)",
         "placeholder_code": "Ders Kodu",
         "placeholder_name": "Ders Adı",
         "placeholder_credits": "Kredi",
+        "placeholder_filter": "Döneme, ders koduna veya nota göre filtrele",
         "grading_scale": "Not Baremi: AA=4.00 | BA=3.50 | BB=3.00 | CB=2.50 | CC=2.00 | DC=1.50 | DD=1.00 | FD=0.50 | FF=0.00"
     }
 }
 
+# Virtualized Table Settings (must match the Treeview style rowheight)
+ROW_HEIGHT = 38
+HEADING_HEIGHT = 34
+WHEEL_ROWS = 3
+
+
+def course_row_values(c):
+    val = GRADE_POINTS.get(c["grade"], 0)
+    pts = c["credits"] * val if c["grade"] not in GPA_EXCLUDED_GRADES else 0
+    return (c["semester"], c["code"], c["name"], c["credits"], c["grade"], f"{pts:.2f}" if c["grade"] not in GPA_EXCLUDED_GRADES else "-")
+
+
+class CourseTable:
+    # Virtualized Treeview: only a pool of viewport-sized row items exists and it is re-filled on scroll,
+    # so scrolling, sorting and filtering cost depends on the visible rows, not on the number of courses
+    def __init__(self, master, columns):
+        self.columns = columns
+        self.tree = ttk.Treeview(master, columns=columns, show="headings", selectmode="browse", height=1)
+        self.scrollbar = ctk.CTkScrollbar(master, command=self.yview, button_color=BURGUNDY, button_hover_color=BURGUNDY_HOVER)
+        self.courses, self.view, self.slots = [], [], []
+        self.top, self.selected, self.query = 0, None, ""
+        self.sort_column, self.sort_reverse = None, False
+        # Set when a course is edited in place; the next filter change then rescans every course
+        self.edited = False
+
+        for col in columns:
+            self.tree.heading(col, command=lambda c=col: self.sort_by(c))
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-WHEEL_ROWS if e.delta > 0 else WHEEL_ROWS))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(WHEEL_ROWS))
+        self.tree.bind("<Up>", lambda e: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self.move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-len(self.slots)))
+        self.tree.bind("<Next>", lambda e: self.scroll(len(self.slots)))
+
+    # Data
+    def set_courses(self, courses):
+        self.courses = courses
+        self.refresh_view()
+
+    def matches(self, c):
+        query = self.query.lower()
+        return not query or query in c["semester"].lower() or query in c["code"].lower() or query in c["grade"].lower()
+
+    def refresh_view(self):
+        view = [c for c in self.courses if self.matches(c)]
+        if self.sort_column: view.sort(key=self.sort_key, reverse=self.sort_reverse)
+        self.view, self.edited = view, False
+        self.render()
+
+    def sort_key(self, c):
+        col = self.sort_column
+        if col == "semester":
+            return transcript_engine.term_id(c["semester"])
+        if col == "credits": return c["credits"]
+        if col == "grade": return GRADE_POINTS.get(c["grade"], -1)
+        if col == "points": return c["credits"] * GRADE_POINTS.get(c["grade"], 0) if c["grade"] not in GPA_EXCLUDED_GRADES else -1
+        return str(c[col]).lower()
+
+    def sort_by(self, column):
+        self.sort_reverse = not self.sort_reverse if self.sort_column == column else False
+        self.sort_column = column
+        self.refresh_view()
+
+    def set_filter(self, query):
+        query = query.strip()
+        if query == self.query: return
+        # Typing more characters can only narrow the current view, so there is no need to rescan every course,
+        # unless an edit may have made a course outside the view match
+        narrowing = self.query and query.lower().startswith(self.query.lower()) and not self.edited
+        self.query, self.top = query, 0
+        if narrowing:
+            self.view = [c for c in self.view if self.matches(c)]
+            self.render()
+        else:
+            self.refresh_view()
+
+    def insert(self, course):
+        # Places a row where a re-sort would put it (after equal keys, as the course is appended to the list) and
+        # returns its index; unsorted views just append
+        if not self.sort_column:
+            self.view.append(course)
+            return len(self.view) - 1
+        key, lo, hi = self.sort_key(course), 0, len(self.view)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = self.sort_key(self.view[mid])
+            if (other >= key) if self.sort_reverse else (other <= key): lo = mid + 1
+            else: hi = mid
+        self.view.insert(lo, course)
+        return lo
+
+    def add(self, course):
+        if not self.matches(course): return
+        idx = self.insert(course)
+        if not self.top <= idx < self.top + len(self.slots): self.top = max(0, idx - len(self.slots) + 1)
+        self.selected = course
+        self.render()
+
+    def extend(self, courses, replaced=()):
+        # Live parse preview: only the new rows are placed; a retaken course swaps out its earlier attempt
+        gone = {id(old) for old, _ in replaced}
+        if gone:
+            self.view = [c for c in self.view if id(c) not in gone]
+            if id(self.selected) in gone: self.selected = None
+        # A course can be replaced again later in the same section, so rows that are already gone are skipped
+        for c in courses + [new for _, new in replaced]:
+            if id(c) not in gone and self.matches(c): self.insert(c)
+        self.render()
+
+    def remove(self, course):
+        self.view = [c for c in self.view if c is not course]
+        if self.selected is course: self.selected = None
+        self.render()
+
+    def update_course(self, course):
+        self.edited = True
+        for i, iid in enumerate(self.slots):
+            idx = self.top + i
+            if idx < len(self.view) and self.view[idx] is course:
+                self.tree.item(iid, values=course_row_values(course))
+
+    def course_at(self, iid):
+        if iid not in self.slots: return None
+        idx = self.top + self.slots.index(iid)
+        return self.view[idx] if idx < len(self.view) else None
+
+    # Rendering
+    def render(self):
+        self.top = max(0, min(self.top, len(self.view) - len(self.slots)))
+        selection = ()
+        for i, iid in enumerate(self.slots):
+            idx = self.top + i
+            if idx < len(self.view):
+                c = self.view[idx]
+                self.tree.item(iid, values=course_row_values(c))
+                self.tree.move(iid, "", i)
+                if c is self.selected: selection = (iid,)
+            else:
+                self.tree.detach(iid)
+        self.tree.selection_set(selection)
+
+        total = len(self.view)
+        if total: self.scrollbar.set(self.top / total, min(1.0, (self.top + len(self.slots)) / total))
+        else: self.scrollbar.set(0, 1)
+
+    def on_resize(self, event):
+        count = max(1, (event.height - HEADING_HEIGHT) // ROW_HEIGHT)
+        if count == len(self.slots): return
+        while len(self.slots) < count:
+            self.slots.append(self.tree.insert("", tk.END, iid=f"slot{len(self.slots)}", values=()))
+        while len(self.slots) > count:
+            self.tree.delete(self.slots.pop())
+        self.render()
+
+    def on_select(self, event):
+        selection = self.tree.selection()
+        if selection: self.selected = self.course_at(selection[0])
+
+    def scroll(self, rows):
+        self.top += rows
+        self.render()
+        return "break"
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.view))
+        elif args[0] == "scroll":
+            self.top += int(args[1]) * (len(self.slots) if args[2] == "pages" else 1)
+        self.render()
+
+    def move_selection(self, step):
+        if not self.view: return "break"
+        idx = next((i for i, c in enumerate(self.view) if c is self.selected), self.top - 1 if step > 0 else self.top)
+        idx = max(0, min(len(self.view) - 1, idx + step))
+        self.selected = self.view[idx]
+        if idx < self.top: self.top = idx
+        elif idx >= self.top + len(self.slots): self.top = idx - len(self.slots) + 1
+        self.render()
+        return "break"
+
+
 class ModernTranscriptApp(ctk.CTk):
     def __init__(self):
         super().__init__()
 
         self.current_lang = "English"
         self.courses = []
+        self.totals = transcript_engine.GpaAggregator()
+        # Attempt history of retaken courses ({code: attempts}); the earlier attempts only count in the "all attempts" GPA
+        self.retakes, self.superseded = {}, transcript_engine.GpaAggregator()
+        self.parse_job = None
+        self.cache, self.cache_opened = None, False
+        self.store = None
+        # The saved session the table belongs to; saving again overwrites it
+        self.session = {"id": None, "student_id": None, "source": None}
+        self.first_frame_shown = False
+        # Built after the first frame (the table) or on first use (parse progress) to keep them off the startup path
+        self.table = self.progress_frame = None
         
         # Initial UI Setup
         self.setup_ui_base()
         self.update_ui_text()
+        mark_startup("widgets built")
+        self.bind("<Map>", self.on_first_map, add="+")
+
+    def on_first_map(self, event):
+        if event.widget is not self or self.first_frame_shown: return
+        self.first_frame_shown = True
+        mark_startup("first frame mapped")
+        self.after_idle(self.build_table)
+        if STARTUP_REPORT: self.after_idle(print_startup_report)
+        self.after(PREWARM_DELAY_MS, transcript_engine.prewarm)
+
+    def get_cache(self):
+        # Opened on first use so SQLite setup stays off the startup path
+        if not self.cache_opened:
+            self.cache_opened = True
+            try:
+                self.cache = ParseCache(transcript_engine.PARSER_VERSION)
+            except (OSError, sqlite3.Error):
+                self.cache = None
+        return self.cache
+
+    def get_store(self):
+        # Opened on first save/open; errors are shown to the user by the caller
+        if self.store is None: self.store = TranscriptStore()
+        return self.store
 
     def setup_ui_base(self):
         self.title("Transcript Calculator")
@@ -115,7 +373,7 @@ class ModernTranscriptApp(ctk.CTk):
         # Sidebar
         self.sidebar_frame = ctk.CTkFrame(self, width=240, corner_radius=0)
         self.sidebar_frame.grid(row=0, column=0, rowspan=4, sticky="nsew")
-        self.sidebar_frame.grid_rowconfigure(4, weight=1)
+        self.sidebar_frame.grid_rowconfigure(6, weight=1)
 
         self.logo_label = ctk.CTkLabel(self.sidebar_frame, text="", font=ctk.CTkFont(family="Segoe UI Variable Display", size=24, weight="bold"))
         self.logo_label.grid(row=0, column=0, padx=20, pady=(30, 30))
@@ -131,18 +389,24 @@ class ModernTranscriptApp(ctk.CTk):
         self.btn_delete = ctk.CTkButton(self.sidebar_frame, text="", command=self.delete_course, font=btn_font, fg_color="transparent", border_color=BURGUNDY, border_width=2, hover_color=BURGUNDY_HOVER, height=45)
         self.btn_delete.grid(row=3, column=0, padx=20, pady=12)
 
+        self.btn_save_session = ctk.CTkButton(self.sidebar_frame, text="", command=self.save_session, font=btn_font, fg_color="transparent", border_color=BURGUNDY, border_width=2, hover_color=BURGUNDY_HOVER, height=45)
+        self.btn_save_session.grid(row=4, column=0, padx=20, pady=12)
+
+        self.btn_open_session = ctk.CTkButton(self.sidebar_frame, text="", command=self.open_session, font=btn_font, fg_color="transparent", border_color=BURGUNDY, border_width=2, hover_color=BURGUNDY_HOVER, height=45)
+        self.btn_open_session.grid(row=5, column=0, padx=20, pady=12)
+
         # Language Selection
         self.lang_label = ctk.CTkLabel(self.sidebar_frame, text="", anchor="w", font=ctk.CTkFont(size=12))
-        self.lang_label.grid(row=5, column=0, padx=20, pady=(10, 0))
+        self.lang_label.grid(row=7, column=0, padx=20, pady=(10, 0))
         self.lang_menu = ctk.CTkOptionMenu(self.sidebar_frame, values=["English", "Türkçe"], command=self.change_language, fg_color=BURGUNDY, button_color=BURGUNDY, button_hover_color=BURGUNDY_HOVER)
-        self.lang_menu.grid(row=6, column=0, padx=20, pady=(5, 10))
+        self.lang_menu.grid(row=8, column=0, padx=20, pady=(5, 10))
         self.lang_menu.set("English")
 
         # Appearance Mode
         self.appearance_label = ctk.CTkLabel(self.sidebar_frame, text="", anchor="w", font=ctk.CTkFont(size=12))
-        self.appearance_label.grid(row=7, column=0, padx=20, pady=(10, 0))
+        self.appearance_label.grid(row=9, column=0, padx=20, pady=(10, 0))
         self.appearance_menu = ctk.CTkOptionMenu(self.sidebar_frame, values=["Dark", "Light", "System"], command=self.change_appearance, fg_color=BURGUNDY, button_color=BURGUNDY, button_hover_color=BURGUNDY_HOVER)
-        self.appearance_menu.grid(row=8, column=0, padx=20, pady=(5, 20))
+        self.appearance_menu.grid(row=10, column=0, padx=20, pady=(5, 20))
 
         # Main Content
         self.main_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -160,7 +424,9 @@ class ModernTranscriptApp(ctk.CTk):
         self.gpa_title_label = ctk.CTkLabel(self.gpa_card, text="", font=ctk.CTkFont(size=13))
         self.gpa_title_label.pack(pady=(15, 0))
         self.gpa_val_label = ctk.CTkLabel(self.gpa_card, text="--", font=ctk.CTkFont(size=42, weight="bold"), text_color=BURGUNDY)
-        self.gpa_val_label.pack(pady=(0, 15))
+        self.gpa_val_label.pack(pady=(0, 0))
+        self.gpa_all_label = ctk.CTkLabel(self.gpa_card, text="", font=ctk.CTkFont(size=12), text_color="gray")
+        self.gpa_all_label.pack(pady=(0, 10))
 
         self.credits_card = ctk.CTkFrame(self.stats_frame)
         self.credits_card.grid(row=0, column=1, padx=(15, 0), sticky="nsew")
@@ -172,9 +438,19 @@ class ModernTranscriptApp(ctk.CTk):
         # Table
         self.table_container = ctk.CTkFrame(self.main_frame)
         self.table_container.grid(row=1, column=0, sticky="nsew")
-        self.table_container.grid_rowconfigure(0, weight=1)
+        self.table_container.grid_rowconfigure(1, weight=1)
         self.table_container.grid_columnconfigure(0, weight=1)
 
+        # Footer
+        self.help_label = ctk.CTkLabel(self.main_frame, text="", font=ctk.CTkFont(family="Segoe UI Variable Text", size=13, slant="italic"))
+        self.help_label.grid(row=2, column=0, sticky="w", pady=(15, 0))
+        
+        self.grading_label = ctk.CTkLabel(self.main_frame, text="", font=ctk.CTkFont(size=11), text_color="gray")
+        self.grading_label.grid(row=3, column=0, sticky="w")
+
+    def build_table(self):
+        # Runs right after the first frame; anything that fills the table calls it first in case it comes earlier
+        if self.table is not None: return
         style = ttk.Style()
         style.theme_use("clam")
         style.configure("Treeview", background="#1e1e1e", foreground="#dce4ee", fieldbackground="#1e1e1e", bordercolor="#1e1e1e", borderwidth=0, font=("Segoe UI", 12), rowheight=38)
@@ -182,21 +458,33 @@ class ModernTranscriptApp(ctk.CTk):
         style.map("Treeview", background=[("selected", BURGUNDY)])
         style.map("Treeview.Heading", background=[("active", BURGUNDY_HOVER)])
 
+        self.filter_entry = ctk.CTkEntry(self.table_container, placeholder_text="")
+        self.filter_entry.grid(row=0, column=0, columnspan=2, sticky="ew", padx=2, pady=(2, 6))
+        self.filter_entry.bind("<KeyRelease>", lambda e: self.table.set_filter(self.filter_entry.get()))
+
         self.columns = ("semester", "code", "name", "credits", "grade", "points")
-        self.tree = ttk.Treeview(self.table_container, columns=self.columns, show="headings", selectmode="browse")
-        self.tree.grid(row=0, column=0, sticky="nsew", padx=2, pady=2)
-        
-        self.scrollbar = ctk.CTkScrollbar(self.table_container, command=self.tree.yview, button_color=BURGUNDY, button_hover_color=BURGUNDY_HOVER)
-        self.scrollbar.grid(row=0, column=1, sticky="ns")
-        self.tree.configure(yscrollcommand=self.scrollbar.set)
+        self.table = CourseTable(self.table_container, self.columns)
+        self.tree = self.table.tree
+        self.tree.grid(row=1, column=0, sticky="nsew", padx=2, pady=2)
+        self.table.scrollbar.grid(row=1, column=1, sticky="ns")
         self.tree.bind("<Double-1>", self.on_double_click)
-
-        # Footer
-        self.help_label = ctk.CTkLabel(self.main_frame, text="", font=ctk.CTkFont(family="Segoe UI Variable Text", size=13, slant="italic"))
-        self.help_label.grid(row=2, column=0, sticky="w", pady=(15, 0))
-        
-        self.grading_label = ctk.CTkLabel(self.main_frame, text="", font=ctk.CTkFont(size=11), text_color="gray")
-        self.grading_label.grid(row=3, column=0, sticky="w")
+        self.update_table_text()
+        mark_startup("table built")
+
+    def show_progress(self):
+        # Parse Progress (shown only while a PDF is being read)
+        if self.progress_frame is None:
+            self.progress_frame = ctk.CTkFrame(self.sidebar_frame, fg_color="transparent")
+            self.progress_frame.grid(row=6, column=0, padx=20, pady=12, sticky="new")
+            self.progress_label = ctk.CTkLabel(self.progress_frame, text="", font=ctk.CTkFont(size=12))
+            self.progress_label.pack(fill="x")
+            self.progress_bar = ctk.CTkProgressBar(self.progress_frame, progress_color=BURGUNDY)
+            self.progress_bar.pack(fill="x", pady=(5, 10))
+            self.btn_cancel_parse = ctk.CTkButton(self.progress_frame, text=LANGUAGES[self.current_lang]["cancel"], command=self.cancel_parse, fg_color="transparent", border_color=BURGUNDY, border_width=2, hover_color=BURGUNDY_HOVER, height=32)
+            self.btn_cancel_parse.pack(fill="x")
+        self.progress_bar.set(0)
+        self.progress_label.configure(text="")
+        self.progress_frame.grid()
 
     def update_ui_text(self):
         lang = LANGUAGES[self.current_lang]
@@ -205,12 +493,20 @@ class ModernTranscriptApp(ctk.CTk):
         self.btn_upload.configure(text=lang["btn_upload"])
         self.btn_add.configure(text=lang["btn_add"])
         self.btn_delete.configure(text=lang["btn_delete"])
+        self.btn_save_session.configure(text=lang["btn_save_session"])
+        self.btn_open_session.configure(text=lang["btn_open_session"])
+        if self.progress_frame is not None: self.btn_cancel_parse.configure(text=lang["cancel"])
         self.lang_label.configure(text=lang["language_mode"])
         self.appearance_label.configure(text=lang["appearance_mode"])
         self.gpa_title_label.configure(text=lang["gpa_title"])
         self.credits_title_label.configure(text=lang["credits_title"])
         self.help_label.configure(text=lang["hint"])
         self.grading_label.configure(text=lang["grading_scale"])
+        if self.table is not None: self.update_table_text()
+
+    def update_table_text(self):
+        lang = LANGUAGES[self.current_lang]
+        self.filter_entry.configure(placeholder_text=lang["placeholder_filter"])
 
         # Table Headings
         for col, key in zip(self.columns, ["col_semester", "col_code", "col_name", "col_credits", "col_grade", "col_points"]):
@@ -228,180 +524,191 @@ class ModernTranscriptApp(ctk.CTk):
         self.current_lang = new_lang
         self.update_ui_text()
         self.refresh_table()
+        self.update_stats()
 
     def change_appearance(self, mode):
         ctk.set_appearance_mode(mode)
 
     def upload_pdf(self):
-        lang = LANGUAGES[self.current_lang]
+        if self.parse_job: return
         filepath = filedialog.askopenfilename(filetypes=[("PDF", "*.pdf")])
         if not filepath: return
-        
+
+        # Parse on a worker thread; the Tk loop only polls for progress and partial results
+        self.courses_before_parse, self.preview_latest = self.courses, None
+        self.retakes_before_parse = self.retakes
+        self.set_retakes({})
+        self.parse_source = filepath
+        self.parse_job = transcript_engine.BackgroundParse(filepath, self.get_cache())
+        self.btn_upload.configure(state="disabled")
+        self.show_progress()
+        self.after(PARSE_POLL_MS, self.poll_parse)
+
+    def cancel_parse(self):
+        if self.parse_job: self.parse_job.cancel()
+
+    def poll_parse(self):
+        lang = LANGUAGES[self.current_lang]
+        job = self.parse_job
         try:
-            self.courses = self.parse_pdf(filepath)
-            self.refresh_table()
-            self.calculate_gpa()
-        except Exception as e:
-            messagebox.showerror(lang["edit_title"], f"{lang['error_pdf']}: {str(e)}")
-
-    def parse_pdf(self, filepath):
-        all_found_courses = []
-        with pdfplumber.open(filepath) as pdf:
-            for page in pdf.pages:
-                mid_x = page.width / 2
-                left_text = page.crop((0, 0, mid_x, page.height)).extract_text() or ""
-                right_text = page.crop((mid_x, 0, page.width, page.height)).extract_text() or ""
-                
-                sections = self.process_column(left_text) + self.process_column(right_text)
-                for section in sections:
-                    for c in section["courses"]:
-                        all_found_courses.append({
-                            "semester": section["semester"],
-                            "code": c["code"],
-                            "name": c["name"],
-                            "credits": c["credits"],
-                            "grade": c["grade"]
-                        })
-        
-        # Dynamic Chronological Sort
-        def get_chronological_rank(sem_str):
-            # Extract year (e.g. 2022 from 2022-2023)
-            year_match = re.search(r'(\d{4})', sem_str)
-            year = int(year_match.group(1)) if year_match else 0
-            
-            # Rank seasons: Güz < Bahar < Yaz
-            rank = 0
-            if "Güz" in sem_str: rank = 1
-            elif "Bahar" in sem_str: rank = 2
-            elif "Yaz" in sem_str: rank = 3
-            
-            return (year * 10) + rank
-
-        all_found_courses.sort(key=lambda x: get_chronological_rank(x["semester"]))
-        
-        # Populate course_dict (later chronologically overwrites older ones)
-        course_dict = {}
-        for c in all_found_courses:
-            course_dict[c["code"]] = c
-            
-        # Return sorted list for UI display
-        result = list(course_dict.values())
-        result.sort(key=lambda x: get_chronological_rank(x["semester"]))
-        return result
+            while True:
+                event = job.events.get_nowait()
+                if event[0] == "progress":
+                    page_no, page_count = event[1], event[2]
+                    self.progress_bar.set(page_no / page_count if page_count else 1)
+                    self.progress_label.configure(text=f"{lang['parsing']} {page_no}/{page_count}")
+                elif event[0] == "section":
+                    self.preview_section(event[1])
+                elif event[0] == "done":
+                    self.set_retakes(event[2].get("retakes", {}))
+                    self.finish_parse([Course.from_dict(c) for c in event[1]])
+                    self.session = {"id": None, "student_id": event[2].get("student_id"), "source": self.parse_source}
+                    return
+                elif event[0] == "cancelled":
+                    self.set_retakes(self.retakes_before_parse)
+                    self.finish_parse(self.courses_before_parse)
+                    return
+                elif event[0] == "error":
+                    self.set_retakes(self.retakes_before_parse)
+                    self.finish_parse(self.courses_before_parse)
+                    messagebox.showerror(lang["edit_title"], f"{lang['error_pdf']}: {event[1]}")
+                    return
+        except queue.Empty:
+            pass
+        self.after(PARSE_POLL_MS, self.poll_parse)
+
+    def preview_section(self, section):
+        # Live preview with a running GPA while the remaining pages are parsed. Only this section's courses are
+        # resolved against the latest attempt shown so far ({code: (term, index)}), so a long parse stays linear;
+        # the "done" event replaces the preview with the fully resolved list.
+        if self.preview_latest is None:
+            self.preview_latest, self.courses = {}, []
+            self.refresh_table(); self.calculate_gpa()
+        term, added, replaced = section["term"], [], []
+        for c in section["courses"]:
+            latest = self.preview_latest.get(c["code"])
+            if latest is None:
+                self.preview_latest[c["code"]] = (term, len(self.courses))
+                self.courses.append(c)
+                self.totals.add(c)
+                added.append(c)
+            elif term >= latest[0]:
+                old = self.courses[latest[1]]
+                self.preview_latest[c["code"]] = (term, latest[1])
+                self.courses[latest[1]] = c
+                self.totals.replace(old, c)
+                replaced.append((old, c))
+        self.table.extend(added, replaced)
+        self.update_stats()
+
+    def finish_parse(self, courses):
+        self.parse_job = None
+        self.progress_frame.grid_remove()
+        self.btn_upload.configure(state="normal")
+        self.courses = courses
+        self.refresh_table()
+        self.calculate_gpa()
+
+    def save_session(self):
+        if self.parse_job or not self.courses: return
+        lang = LANGUAGES[self.current_lang]
+        default = self.session["student_id"] or os.path.splitext(os.path.basename(self.session["source"] or ""))[0]
+        name = ctk.CTkInputDialog(text=lang["session_name"], title=lang["btn_save_session"]).get_input()
+        if name is None: return
+        try:
+            self.session["id"] = self.get_store().save_session(self.courses, name.strip() or default or lang["title"],
+                                                               self.session["student_id"], self.session["source"], self.session["id"])
+        except (OSError, sqlite3.Error) as e:
+            messagebox.showerror(lang["edit_title"], f"{lang['error_store']}: {e}")
+            return
+        messagebox.showinfo(lang["btn_save_session"], lang["session_saved"])
+
+    def open_session(self):
+        if self.parse_job: return
+        lang = LANGUAGES[self.current_lang]
+        try:
+            sessions = self.get_store().sessions()
+        except (OSError, sqlite3.Error) as e:
+            messagebox.showerror(lang["edit_title"], f"{lang['error_store']}: {e}")
+            return
+        if not sessions:
+            messagebox.showinfo(lang["session_title"], lang["no_sessions"])
+            return
+
+        dialog = ctk.CTkToplevel(self)
+        dialog.title(lang["session_title"])
+        dialog.geometry("460x220")
+        dialog.after(100, dialog.lift)
+        dialog.grab_set()
+
+        labels = {f"{s['name']} · {s['course_count']} · {time.strftime('%Y-%m-%d %H:%M', time.localtime(s['saved_at']))}": s for s in sessions}
+        ctk.CTkLabel(dialog, text=lang["session_title"], font=ctk.CTkFont(size=16, weight="bold")).pack(pady=20)
+        choice = ctk.CTkOptionMenu(dialog, values=list(labels), width=400, fg_color=BURGUNDY, button_color=BURGUNDY, button_hover_color=BURGUNDY_HOVER); choice.pack(pady=5)
+
+        def load():
+            s = labels[choice.get()]
+            try:
+                courses = self.get_store().load_session(s["id"])
+            except sqlite3.Error as e:
+                messagebox.showerror(lang["edit_title"], f"{lang['error_store']}: {e}")
+                return
+            self.session = {"id": s["id"], "student_id": s["student_id"], "source": s["source"]}
+            self.courses = courses
+            self.set_retakes({})
+            self.refresh_table(); self.calculate_gpa()
+            dialog.destroy()
+
+        ctk.CTkButton(dialog, text=lang["open"], command=load, fg_color=BURGUNDY, hover_color=BURGUNDY_HOVER).pack(pady=20)
+
+    def parse_pdf(self, filepath, on_section=None):
+        return transcript_engine.load_courses(filepath, self.get_cache(), on_section=on_section)
 
     def process_column(self, text):
-        result = []
-        lines = text.split('\n')
-        current_semester, current_courses = None, []
-        
-        for line in lines:
-            line = line.strip()
-            if not line: continue
-            
-            # Semester detection
-            sem_match = re.search(r'(\d{4}-\d{4}\s+Yılı?\s*(?:Güz|Bahar|Yaz)\s*Dönemi)', line, re.IGNORECASE)
-            if sem_match:
-                if current_semester and current_courses: result.append({"semester": current_semester, "courses": current_courses})
-                current_semester, current_courses = sem_match.group(1), []
-                continue
-            
-            # Ultra-robust Regex: Handles mashed codes, complex grades, and trailing annotations
-            # 1: Code, 2: Name, 3: Credits, 4: Grade (with optional parenthetical info)
-            pattern = r'^\s*([A-Z]{2,5}\d{3}[A-Z]?|\d{5,12}(?:\s*\([^)]*\))*)\s*(.*?)\s+(\d+)\s*[|/\s]+\d+\s+([A-Z]{1,2})'
-            course_match = re.search(pattern, line)
-            
-            if course_match and current_semester:
-                code = course_match.group(1).strip()
-                name = course_match.group(2).strip()
-                credits = int(course_match.group(3))
-                grade_raw = course_match.group(4).strip()
-                
-                # Extract only the base letter grade (e.g., "AA" from "AA(12)")
-                grade_match = re.match(r'^([A-Z]{1,2})', grade_raw)
-                grade = grade_match.group(1) if grade_match else grade_raw
-                
-                # Targeted noise removal from name
-                noise = [
-                    r'[\s\-:,\.]+(?:\d{4}[\s\-:,\.]*)?(?:Güz|Bahar|Yaz)[\s\-:,\.]*$',
-                    r'\s*\(?Erasmus\)?\s*$',
-                    r'resmi işlemlerde kullanılamaz.*$',
-                    r'Alınan.*$',
-                    r'Tamamlanan.*$',
-                    r'Hesaplan.*$',
-                    r'Açıklama.*$',
-                    r'Tarih :.*$'
-                ]
-                for p in noise:
-                    name = re.sub(p, '', name, flags=re.IGNORECASE).strip()
-                
-                current_courses.append({
-                    "semester": current_semester,
-                    "code": code,
-                    "name": name,
-                    "credits": credits,
-                    "grade": grade
-                })
-            elif current_courses and current_semester:
-                # Better Continuation Logic
-                system_text = ["Bu belge", "Yarıyıl :", "Genel :", "Ders Kodu", "AKTS", "resmi iş", "Alınan", "Tamamlanan", "Hesaplan", "Puan >", "YNO", "Açıklama", "Tarih :"]
-                if any(x in line for x in system_text): continue
-                
-                # If line is NOT a new course start or semester start
-                is_new_course = re.match(r'^[A-Z]{2,5}\d{3}', line) or re.match(r'^\d{5,12}', line)
-                is_new_semester = re.search(r'\b\d{4}\b.*\b(?:Güz|Bahar|Yaz)\b', line, re.IGNORECASE)
-                
-                if not is_new_course and not is_new_semester:
-                    clean_line = line.strip()
-                    if clean_line and len(clean_line) > 1:
-                        # Avoid appending single grades or credits that might be floating
-                        if clean_line in GPA_EXCLUDED_GRADES or clean_line in GRADE_POINTS: continue
-                        
-                        current_courses[-1]["name"] = (current_courses[-1]["name"] + " " + clean_line).strip()
-                        # Final cleanup
-                        for p in [r'[\s\-:,\.]+(?:\d{4}[\s\-:,\.]*)?(?:Güz|Bahar|Yaz)[\s\-:,\.]*$', r'\s*\(?Erasmus\)?\s*$', r'\s*[:,\-]\s*$']:
-                            current_courses[-1]["name"] = re.sub(p, '', current_courses[-1]["name"]).strip()
-
-        if current_semester and current_courses: result.append({"semester": current_semester, "courses": current_courses})
-        
-        # Final formatting Pass
-        for sec in result:
-            for c in sec["courses"]:
-                # Polish name items
-                for p in [r'\bresmi işlemlerde\b.*$', r'\bAlınan\b.*$', r'\bTamamlanan\b.*$', r'\s+Erasmus\s*$']:
-                    c["name"] = re.sub(p, '', c["name"], flags=re.IGNORECASE).strip()
-                # Unified code format
-                c["code"] = re.sub(r'\s*\(Erasmus\)', '(Erasmus)', c["code"], flags=re.IGNORECASE).strip()
-                # Remove common duplicate artifacts in code
-                c["code"] = re.sub(r'\s*\(\s*([A-Z0-9]+)\s*\)', r' (\1)', c["code"]) 
-        return result
+        return transcript_engine.process_column(text)
 
     def refresh_table(self):
-        for item in self.tree.get_children(): self.tree.delete(item)
-        for i, c in enumerate(self.courses):
-            val = GRADE_POINTS.get(c["grade"], 0)
-            pts = c["credits"] * val if c["grade"] not in GPA_EXCLUDED_GRADES else 0
-            self.tree.insert("", tk.END, iid=i, values=(c["semester"], c["code"], c["name"], c["credits"], c["grade"], f"{pts:.2f}" if c["grade"] not in GPA_EXCLUDED_GRADES else "-"))
+        self.build_table()
+        self.table.set_courses(self.courses)
 
     def calculate_gpa(self):
-        p, k = 0, 0
-        for c in self.courses:
-            if c["grade"] not in GPA_EXCLUDED_GRADES:
-                p += (c["credits"] * GRADE_POINTS.get(c["grade"], 0))
-                k += c["credits"]
-        self.gpa_val_label.configure(text=f"{p/k:.2f}" if k > 0 else "--")
+        # Full recompute; single edits go through self.totals instead
+        self.totals = transcript_engine.GpaAggregator(self.courses)
+        self.update_stats()
+
+    def set_retakes(self, retakes):
+        self.retakes = retakes
+        self.superseded = transcript_engine.GpaAggregator(transcript_engine.superseded_attempts(retakes))
+
+    def drop_retakes(self, code):
+        # Once no course with this code is left (deleted, or its code edited), its earlier attempts stop counting too
+        if code in self.retakes and not any(c["code"] == code for c in self.courses):
+            self.set_retakes({k: v for k, v in self.retakes.items() if k != code})
+
+    def update_stats(self):
+        gpa, k = self.totals.gpa(), self.totals.credits
+        self.gpa_val_label.configure(text=f"{gpa:.2f}" if k > 0 else "--")
         self.credits_val_label.configure(text=f"{k}" if k > 0 else "--")
 
+        # Retaken courses: also show the GPA with every earlier attempt counted
+        all_credits = k + self.superseded.credits
+        if self.superseded.semesters and all_credits > 0:
+            gpa_all = (self.totals.points + self.superseded.points) / all_credits
+            self.gpa_all_label.configure(text=f"{LANGUAGES[self.current_lang]['gpa_all_attempts']}: {gpa_all:.2f}")
+        else:
+            self.gpa_all_label.configure(text="")
+
     def delete_course(self):
-        selected = self.tree.selection()
-        if not selected: return
-        # Sort indices in reverse to avoid index shifting problems
-        indices = sorted([int(item) for item in selected], reverse=True)
-        for idx in indices:
-            del self.courses[idx]
-        self.refresh_table()
-        self.calculate_gpa()
+        if self.parse_job or self.table is None: return
+        course = self.table.selected
+        if course is None: return
+        self.courses[:] = [c for c in self.courses if c is not course]
+        self.totals.remove(course)
+        self.drop_retakes(course["code"])
+        self.table.remove(course)
+        self.update_stats()
 
     def add_course(self):
+        if self.parse_job: return
         lang = LANGUAGES[self.current_lang]
         dialog = ctk.CTkToplevel(self)
         dialog.title(lang["add_title"])
@@ -418,21 +725,27 @@ class ModernTranscriptApp(ctk.CTk):
 
         def save():
             try:
-                self.courses.append({"semester": sem.get(), "code": code.get(), "name": name.get(), "credits": int(credits.get()), "grade": grade.get()})
-                self.refresh_table(); self.calculate_gpa(); dialog.destroy()
+                course = Course(sem.get(), code.get(), name.get(), int(credits.get()), grade.get())
+                self.courses.append(course)
+                self.build_table()
+                self.table.add(course)
+                self.totals.add(course)
+                self.update_stats(); dialog.destroy()
             except: messagebox.showerror(lang["edit_title"], lang["error_credits"])
         
         ctk.CTkButton(dialog, text=lang["save"], command=save, fg_color=BURGUNDY, hover_color=BURGUNDY_HOVER).pack(pady=20)
 
     def on_double_click(self, event):
         lang = LANGUAGES[self.current_lang]
+        if self.parse_job: return
         item = self.tree.identify_row(event.y)
         col_idx = int(self.tree.identify_column(event.x)[1:]) - 1
         if not item or col_idx > 4: return
         
-        idx = int(item)
+        course = self.table.course_at(item)
+        if course is None: return
         col_keys = ["semester", "code", "name", "credits", "grade"]
-        current_val = self.courses[idx][col_keys[col_idx]]
+        current_val = course[col_keys[col_idx]]
 
         dialog = ctk.CTkToplevel(self)
         dialog.title(lang["edit_title"])
@@ -454,12 +767,30 @@ class ModernTranscriptApp(ctk.CTk):
             try:
                 val = entry.get()
                 if col_idx == 3: val = int(val)
-                self.courses[idx][col_keys[col_idx]] = val
-                self.refresh_table(); self.calculate_gpa(); dialog.destroy()
+                old = dict(course)
+                course[col_keys[col_idx]] = val
+                self.totals.replace(old, course)
+                if old["code"] != course["code"]: self.drop_retakes(old["code"])
+                self.table.update_course(course)
+                self.update_stats(); dialog.destroy()
             except: messagebox.showerror(lang["edit_title"], lang["error_value"])
         
         ctk.CTkButton(dialog, text=lang["save"], command=save_edit, fg_color=BURGUNDY, hover_color=BURGUNDY_HOVER).pack(pady=10)
 
+def print_startup_report():
+    # The windowed .exe has no stderr, so the report goes to a temp file there
+    if sys.stderr is not None: return write_startup_report(sys.stderr)
+    with open(os.path.join(tempfile.gettempdir(), "transcript_startup.txt"), "w", encoding="utf-8") as stream:
+        write_startup_report(stream)
+
+def write_startup_report(stream):
+    start = previous = STARTUP_MARKS[0][1]
+    print("Startup timing (ms):", file=stream)
+    for label, t in STARTUP_MARKS[1:]:
+        print(f"  {label:<32} +{(t - previous) * 1000:7.1f}  {(t - start) * 1000:8.1f}", file=stream)
+        previous = t
+    stream.flush()
+
 if __name__ == "__main__":
     app = ModernTranscriptApp()
     app.mainloop()
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Transcript Cohort - Department-level statistics across many parsed transcripts
+
+Keeps every student's courses (as returned by parse_pdf / parse_transcript) as small integer/float arrays and
+answers grade distributions per course, per-semester GPA curves and class ranking with vectorized group-bys.
+add() updates the running per-student totals and grade counts in place, so re-ranking after a new transcript
+arrives does not touch the other students' courses.
+
+Usage:
+    python transcript_batch.py transcripts/ -o cohort.jsonl
+    python transcript_cohort.py cohort.jsonl -o report.json
+    python transcript_cohort.py --db advising.sqlite3 --top 20
+"""
+
+import argparse
+import json
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from transcript_engine import superseded_attempts, term_id
+from transcript_scenarios import COUNTED_TABLE, GRADE_CODES, POINTS_TABLE, grade_code
+from transcript_store import TranscriptStore
+
+# One row per kept course of every student
+CohortTable = namedtuple("CohortTable", ["students", "codes", "terms", "credits", "grades"])
+# Ranked students only (at least one graded credit), best first
+Ranking = namedtuple("Ranking", ["student_ids", "gpa", "credits", "rank", "percentile"])
+
+
+def grow(array, size):
+    # Amortized O(1) appends: capacity doubles and the unused tail stays zero
+    if size <= len(array): return array
+    out = np.zeros((max(size, 2 * len(array)),) + array.shape[1:], dtype=array.dtype)
+    out[:len(array)] = array
+    return out
+
+
+def concat(parts, dtype):
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+
+class Cohort:
+    # Adding a student id again replaces that student's previous transcript (e.g. a newer export)
+    def __init__(self, records=()):
+        self.student_ids, self.student_index = [], {}
+        self.codes, self.code_index = [], {}
+        self.term_labels = {}
+        self.rows = {}    # student index -> (codes, terms, credits, grades) of the kept attempts
+        self.graded = {}  # student index -> (codes, grades) of every attempt, as counted in grade_counts
+        self.points, self.credits = np.zeros(0), np.zeros(0)
+        self.grade_counts = np.zeros((0, len(GRADE_CODES)), dtype=np.int64)
+        self._table = None
+        for record in records: self.add_record(record)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, student_id):
+        return self.student_index.get(student_id) in self.rows
+
+    def code(self, code):
+        i = self.code_index.get(code)
+        if i is None:
+            i = self.code_index[code] = len(self.codes)
+            self.codes.append(code)
+            self.grade_counts = grow(self.grade_counts, i + 1)
+        return i
+
+    def columns(self, courses):
+        n = len(courses)
+        codes = np.fromiter((self.code(c["code"]) for c in courses), np.int32, n)
+        terms = np.fromiter((term_id(c["semester"]) for c in courses), np.int32, n)
+        credits = np.fromiter((c["credits"] for c in courses), np.float64, n)
+        grades = np.fromiter((grade_code(c["grade"]) for c in courses), np.int8, n)
+        for c in courses: self.term_labels.setdefault(term_id(c["semester"]), c["semester"])
+        return codes, terms, credits, grades
+
+    def add(self, student_id, courses, retakes=None):
+        # courses: one kept attempt per course (parse_pdf output); GPA, curves and ranking use only these.
+        # retakes ({code: [attempts]}, parse_transcript's record["retakes"]) adds the earlier attempts to the grade distribution.
+        s = self.student_index.get(student_id)
+        if s is None:
+            s = self.student_index[student_id] = len(self.student_ids)
+            self.student_ids.append(student_id)
+            self.points, self.credits = grow(self.points, s + 1), grow(self.credits, s + 1)
+        elif s in self.rows:
+            self.retract(s)
+
+        codes, terms, credits, grades = self.columns(courses)
+        counted = COUNTED_TABLE[grades] * credits
+        self.points[s] = POINTS_TABLE[grades] @ counted
+        self.credits[s] = counted.sum()
+        self.rows[s] = (codes, terms, credits, grades)
+
+        earlier = superseded_attempts(retakes) if retakes else []
+        if earlier:
+            earlier_codes, _, _, earlier_grades = self.columns(earlier)
+            codes, grades = np.concatenate([codes, earlier_codes]), np.concatenate([grades, earlier_grades])
+        np.add.at(self.grade_counts, (codes, grades), 1)
+        self.graded[s] = (codes, grades)
+        self._table = None
+
+    def add_record(self, record):
+        # A parse_transcript() / transcript_batch record; failed parses are skipped. Returns whether it was added.
+        if record.get("error") or not record.get("student_id"): return False
+        self.add(record["student_id"], record["courses"], record.get("retakes"))
+        return True
+
+    def remove(self, student_id):
+        s = self.student_index.get(student_id)
+        if s in self.rows: self.retract(s)
+
+    def retract(self, s):
+        codes, grades = self.graded.pop(s)
+        np.subtract.at(self.grade_counts, (codes, grades), 1)
+        del self.rows[s]
+        self.points[s] = self.credits[s] = 0
+        self._table = None
+
+    def table(self):
+        # All kept courses as one set of columns; rebuilt lazily after changes
+        if self._table is None:
+            students = list(self.rows)
+            parts = [self.rows[s] for s in students]
+            lengths = np.fromiter((len(p[0]) for p in parts), np.intp, len(parts))
+            self._table = CohortTable(np.repeat(np.array(students, dtype=np.int32), lengths),
+                                      *(concat([p[i] for p in parts], dtype) for i, dtype in enumerate((np.int32, np.int32, np.float64, np.int8))))
+        return self._table
+
+    # Statistics
+    def gpa(self):
+        # Indexed by student index; NaN for students without graded credits (or removed)
+        n = len(self.student_ids)
+        points, credits = self.points[:n], self.credits[:n]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(credits > 0, points / credits, np.nan)
+
+    def ranking(self):
+        # Competition ranking (ties share the better rank). percentile is the share of ranked students with a lower
+        # GPA, plus half of those tied, so the median student sits near 50.
+        gpa = self.gpa()
+        ranked = np.flatnonzero(~np.isnan(gpa))
+        # Rounded so students with the same grades tie regardless of summation order
+        values = np.round(gpa[ranked], 9)
+        order = np.lexsort((ranked, -values))
+        ranked, values = ranked[order], values[order]
+        ascending = values[::-1]
+        below = np.searchsorted(ascending, values, side="left")
+        tied = np.searchsorted(ascending, values, side="right") - below
+        rank = len(values) - below - tied + 1
+        percentile = 100.0 * (below + 0.5 * tied) / max(len(values), 1)
+        return Ranking([self.student_ids[s] for s in ranked], gpa[ranked], self.credits[ranked], rank, percentile)
+
+    def standing(self, student_id):
+        # (rank, percentile, ranked student count) of one student, or None when they have no graded credits
+        gpa = self.gpa()
+        s = self.student_index.get(student_id)
+        if s is None or np.isnan(gpa[s]): return None
+        values, own = np.round(gpa[~np.isnan(gpa)], 9), round(float(gpa[s]), 9)
+        below, tied = int((values < own).sum()), int((values == own).sum())
+        return len(values) - below - tied + 1, 100.0 * (below + 0.5 * tied) / len(values), len(values)
+
+    def grade_distribution(self, code=None):
+        # {code: {grade: count}} over every attempt added; UNKNOWN_GRADE ("?") collects unrecognized grades
+        counts = self.grade_counts[:len(self.codes)]
+        codes = [code] if code is not None else self.codes
+        result = {}
+        for c in codes:
+            i = self.code_index.get(c)
+            if i is None: continue
+            row = counts[i]
+            nonzero = np.flatnonzero(row)
+            if len(nonzero): result[c] = {GRADE_CODES[g]: int(row[g]) for g in nonzero}
+        return result
+
+    def course_stats(self):
+        # Per course: attempts, graded attempts and mean grade point (credits are fixed per course, so unweighted)
+        counts = self.grade_counts[:len(self.codes)]
+        graded = counts * COUNTED_TABLE
+        graded_total = graded.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            average = np.where(graded_total > 0, graded @ POINTS_TABLE / graded_total, np.nan)
+        attempts = counts.sum(axis=1)
+        return {code: {"attempts": int(attempts[i]), "graded": int(graded_total[i]),
+                       "average": None if np.isnan(average[i]) else float(average[i])}
+                for i, code in enumerate(self.codes) if attempts[i]}
+
+    def semester_curves(self, percentiles=(25, 50, 75)):
+        # One entry per semester, chronologically: how many students had graded credits that term and the mean and
+        # percentiles of their semester GPA and of their cumulative GPA through that term
+        t = self.table()
+        terms, term_pos = np.unique(t.terms, return_inverse=True)
+        n, width = len(self.student_ids), len(terms)
+        counted = COUNTED_TABLE[t.grades] * t.credits
+        key = t.students.astype(np.intp) * width + term_pos
+        sem_points = np.bincount(key, POINTS_TABLE[t.grades] * counted, n * width).reshape(n, width)
+        sem_credits = np.bincount(key, counted, n * width).reshape(n, width)
+        cum_points, cum_credits = np.cumsum(sem_points, axis=1), np.cumsum(sem_credits, axis=1)
+
+        curves = []
+        for j, term in enumerate(terms):
+            active = sem_credits[:, j] > 0
+            if not active.any(): continue
+            semester_gpa = sem_points[active, j] / sem_credits[active, j]
+            cumulative_gpa = cum_points[active, j] / cum_credits[active, j]
+            curves.append({
+                "semester": self.term_labels[int(term)], "term": int(term), "students": int(active.sum()),
+                "semester_gpa": {"mean": float(semester_gpa.mean()), **{f"p{p}": float(v) for p, v in zip(percentiles, np.percentile(semester_gpa, percentiles))}},
+                "cumulative_gpa": {"mean": float(cumulative_gpa.mean()), **{f"p{p}": float(v) for p, v in zip(percentiles, np.percentile(cumulative_gpa, percentiles))}},
+            })
+        return curves
+
+    def report(self, top=None):
+        ranking = self.ranking()
+        limit = len(ranking.student_ids) if top is None else top
+        return {
+            "students": len(self),
+            "ranked": len(ranking.student_ids),
+            "ranking": [{"student_id": sid, "gpa": round(float(g), 2), "credits": int(k), "rank": int(r), "percentile": round(float(p), 1)}
+                        for sid, g, k, r, p in zip(*(column[:limit] for column in ranking))],
+            "courses": {code: dict(stats, grades=self.grade_distribution(code).get(code, {})) for code, stats in self.course_stats().items()},
+            "semesters": self.semester_curves(),
+        }
+
+
+def iter_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip(): yield json.loads(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade distributions, semester GPA curves and ranking for a cohort of transcripts.")
+    parser.add_argument("records", nargs="*", help="JSON lines written by transcript_batch.py (-f json)")
+    parser.add_argument("--db", help="also load each student's latest ingested transcript from a transcript_watch store")
+    parser.add_argument("--top", type=int, default=None, help="only list the first N students of the ranking")
+    parser.add_argument("-o", "--output", default="-", help="report file (default: stdout)")
+    args = parser.parse_args(argv)
+    if not args.records and not args.db:
+        parser.error("give at least one JSON lines file or --db")
+
+    cohort, skipped = Cohort(), 0
+    if args.db:
+        store = TranscriptStore(args.db)
+        for student_id, courses in store.student_courses(): cohort.add(student_id, courses)
+        store.close()
+    for path in args.records:
+        for record in iter_jsonl(path):
+            if not cohort.add_record(record): skipped += 1
+    if skipped: print(f"Skipped {skipped} record(s) with errors or without a student id", file=sys.stderr)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        json.dump(cohort.report(args.top), out, ensure_ascii=False, indent=1)
+        out.write("\n")
+    finally:
+        if out is not sys.stdout: out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,505 @@
+# -*- coding: utf-8 -*-
+"""
+Transcript Engine - GUI-free PDF parsing and GPA calculation
+"""
+
+import os
+import queue
+import re
+import threading
+from contextlib import nullcontext
+from itertools import accumulate
+
+from transcript_cache import file_digest
+
+# pdfplumber (with pdfminer's font and codec tables) is imported on first use, see load_pdfplumber()
+pdfplumber = None
+chars_to_textmap = None
+fast_page_chars = None
+
+# Read page text through the lean pdfminer device in transcript_fastpath.py; pages it cannot handle, and pages whose
+# text it reads but nothing in it looks like a transcript, go through pdfplumber. Set TRANSCRIPT_EXTRACTION=pdfplumber
+# to always use pdfplumber.
+FAST_EXTRACTION = os.environ.get("TRANSCRIPT_EXTRACTION", "fast") != "pdfplumber"
+
+# Bump whenever parsing output can change, including text extraction (column split, fast path); cached results
+# of other versions are discarded
+PARSER_VERSION = 3
+
+# Grade Point Scaling
+GRADE_POINTS = {
+    "AA": 4.00, "BA": 3.50, "BB": 3.00, "CB": 2.50, "CC": 2.00,
+    "DC": 1.50, "DD": 1.00, "FD": 0.50, "FF": 0.00, "NA": 0.00,
+    "I": 0.00, "S": 0.00, "U": 0.00, "W": 0.00, "NI": 0.00, "EX": 0.00,
+}
+
+# Grades excluded from GPA calculation
+GPA_EXCLUDED_GRADES = {"NA", "I", "S", "U", "W", "NI", "EX", ""}
+
+# Line kinds produced by tokenize_column
+SEMESTER, COURSE, CONTINUATION, BOILERPLATE = "semester", "course", "continuation", "boilerplate"
+
+# Precompiled Line Patterns
+SEMESTER_PATTERN = re.compile(r'(\d{4}-\d{4}\s+Yılı?\s*(?:Güz|Bahar|Yaz)\s*Dönemi)', re.IGNORECASE)
+# Ultra-robust Regex: Handles mashed codes, complex grades, and trailing annotations
+# 1: Code, 2: Name, 3: Credits, 4: Base letter grade (parenthetical info is left out)
+COURSE_PATTERN = re.compile(r'^\s*([A-Z]{2,5}\d{3}[A-Z]?|\d{5,12}(?:\s*\([^)]*\))*)\s*(.*?)\s+(\d+)\s*[|/\s]+\d+\s+([A-Z]{1,2})')
+NEW_COURSE_PATTERN = re.compile(r'^(?:[A-Z]{2,5}\d{3}|\d{5,12})')
+NEW_SEMESTER_PATTERN = re.compile(r'\b\d{4}\b.*\b(?:Güz|Bahar|Yaz)\b', re.IGNORECASE)
+SYSTEM_TEXT = ["Bu belge", "Yarıyıl :", "Genel :", "Ders Kodu", "AKTS", "resmi iş", "Alınan", "Tamamlanan", "Hesaplan", "Puan >", "YNO", "Açıklama", "Tarih :"]
+SYSTEM_TEXT_PATTERN = re.compile("|".join(re.escape(x) for x in SYSTEM_TEXT))
+
+# Name Noise Patterns (applied in order; suffix strips must run before the footer truncation)
+SEASON_SUFFIX = r'[\s\-:,\.]+(?:\d{4}[\s\-:,\.]*)?(?:Güz|Bahar|Yaz)[\s\-:,\.]*$'
+ERASMUS_SUFFIX = r'\s*\(?Erasmus\)?\s*$'
+COURSE_NAME_NOISE = [
+    re.compile(SEASON_SUFFIX, re.IGNORECASE),
+    re.compile(ERASMUS_SUFFIX, re.IGNORECASE),
+    re.compile(r'(?:resmi işlemlerde kullanılamaz|Alınan|Tamamlanan|Hesaplan|Açıklama|Tarih :).*$', re.IGNORECASE),
+]
+CONTINUATION_NOISE = [re.compile(SEASON_SUFFIX), re.compile(ERASMUS_SUFFIX), re.compile(r'\s*[:,\-]\s*$')]
+FINAL_NAME_TRUNCATE = re.compile(r'\b(?:resmi işlemlerde|Alınan|Tamamlanan)\b.*$', re.IGNORECASE)
+FINAL_ERASMUS_SUFFIX = re.compile(r'\s+Erasmus\s*$', re.IGNORECASE)
+CODE_ERASMUS_PATTERN = re.compile(r'\s*\(Erasmus\)', re.IGNORECASE)
+CODE_PAREN_PATTERN = re.compile(r'\s*\(\s*([A-Z0-9]+)\s*\)')
+
+# Semester string -> chronological term id, filled as semesters are first seen (see term_id). Bounded, since the GUI
+# sorts user-typed semesters and the watch/service processes run for a long time; the oldest entry goes first.
+TERM_IDS = {}
+MAX_TERM_IDS = 4096
+
+# Best-effort student number lookup in the transcript header
+STUDENT_ID_PATTERN = re.compile(r'(?:Öğrenci|Ogrenci)\s*(?:No|Numarası)\s*:?\s*(\d{6,12})', re.IGNORECASE)
+
+
+def no_stage(name, **args):
+    # Stand-in for ParseTrace.stage when no trace is given (see transcript_trace.py)
+    return NULL_STAGE
+
+
+NULL_STAGE = nullcontext()
+
+
+def load_pdfplumber():
+    global pdfplumber, chars_to_textmap, fast_page_chars
+    if pdfplumber is None:
+        import pdfplumber as module
+        from pdfplumber.utils import chars_to_textmap
+        from transcript_fastpath import page_chars as fast_page_chars
+        pdfplumber = module
+    return pdfplumber
+
+
+def prewarm():
+    # Import pdfplumber on a background thread so the first "Load PDF" does not pay for it
+    threading.Thread(target=load_pdfplumber, daemon=True).start()
+
+
+class ParseCancelled(Exception):
+    pass
+
+
+def iter_sections(filepath, warnings=None, meta=None, progress=None, trace=None, fast=None):
+    # Yields semester sections page by page; each page's cached chars/layout are released once it is done.
+    # progress(page_no, page_count) runs before the first and after every page and may raise ParseCancelled.
+    if warnings is None: warnings = []
+    if meta is None: meta = {}
+    if fast is None: fast = FAST_EXTRACTION
+    stage = trace.stage if trace else no_stage
+    plumber = load_pdfplumber()
+    with stage("open"):
+        pdf = plumber.open(filepath)
+    with pdf:
+        page_count = len(pdf.pages)
+        if progress: progress(0, page_count)
+        for page_no, page in enumerate(pdf.pages, start=1):
+            left_text, right_text = extract_columns(page, trace, fast)
+            if fast and (left_text or right_text) and not looks_like_transcript(left_text + "\n" + right_text):
+                # Text, but no semester header, system text or student number: check this page through pdfplumber
+                if trace:
+                    trace.count("fastpath.rejected")
+                    trace.sample("fastpath.rejected", f"page {page_no}")
+                left_text, right_text = extract_columns(page, trace, fast=False)
+            page.close()
+            if progress: progress(page_no, page_count)
+            if not left_text and not right_text:
+                warnings.append(f"page {page_no}: no text layer")
+            if "student_id" not in meta:
+                id_match = STUDENT_ID_PATTERN.search(left_text + "\n" + right_text)
+                if id_match: meta["student_id"] = id_match.group(1)
+
+            with stage("tokenize", page=page_no):
+                sections = process_column(left_text, trace) + process_column(right_text, trace)
+            for section in sections:
+                section["page"] = page_no
+                yield section
+
+
+def resolve_courses(all_found_courses, retakes=None, terms=None):
+    # One pass in arrival order: the chronologically latest attempt of each code wins (on equal terms the later
+    # one). Output is ordered by the winning attempt's term, then by the course's first attempt.
+    # retakes, if given, is filled with {code: [every attempt, oldest first]} for courses taken more than once.
+    # terms, if given, holds each course's term id (from its section), so no semester string is looked up again.
+    if terms is None: terms = [term_id(c["semester"]) for c in all_found_courses]
+    latest, first, attempts = {}, {}, {}
+    for i, (c, term) in enumerate(zip(all_found_courses, terms)):
+        code = c["code"]
+        if code not in latest:
+            latest[code], first[code], attempts[code] = (term, c), (term, i), [(term, i, c)]
+            continue
+        if term >= latest[code][0]: latest[code] = (term, c)
+        if term < first[code][0]: first[code] = (term, i)
+        attempts[code].append((term, i, c))
+
+    if retakes is not None:
+        for code, history in attempts.items():
+            if len(history) > 1: retakes[code] = [c for _, _, c in sorted(history, key=lambda a: a[:2])]
+    order = sorted(latest, key=lambda code: (latest[code][0],) + first[code])
+    return [latest[code][1] for code in order]
+
+
+def superseded_attempts(retakes):
+    # Every attempt except the one resolve_courses kept
+    return [c for history in retakes.values() for c in history[:-1]]
+
+
+def all_attempts_gpa(courses, retakes):
+    # GPA counting every attempt of retaken courses, not only the last one
+    return calculate_gpa(list(courses) + superseded_attempts(retakes))
+
+
+def parse_pdf(filepath, warnings=None, meta=None, on_section=None, progress=None, trace=None, fast=None):
+    # on_section(section) is called as soon as each semester section is parsed, for live previews
+    if warnings is None: warnings = []
+    all_found_courses, terms = [], []
+    for section in iter_sections(filepath, warnings, meta, progress, trace, fast):
+        all_found_courses.extend(section["courses"])
+        terms.extend([section["term"]] * len(section["courses"]))
+        if on_section: on_section(section)
+
+    retakes = {}
+    with (trace.stage("resolve") if trace else NULL_STAGE):
+        result = resolve_courses(all_found_courses, retakes, terms)
+    if trace:
+        trace.count("courses.raw", len(all_found_courses))
+        trace.count("courses.resolved", len(result))
+        trace.count("courses.retaken", len(retakes))
+    if meta is not None: meta["retakes"] = retakes
+    if not result: warnings.append("no courses found")
+    for c in result:
+        if c["grade"] not in GRADE_POINTS: warnings.append(f"{c['code']}: unknown grade '{c['grade']}'")
+    return result
+
+
+def find_gutter(chars, width):
+    # Empty vertical band closest to the page centre (searched within the middle 40% of the page)
+    lo, hi = int(width * 0.3), int(width * 0.7)
+    if not chars or hi <= lo: return width / 2
+    diff = [0] * (hi - lo + 1)
+    for ch in chars:
+        a, b = max(int(ch["x0"]), lo), min(int(ch["x1"]) + 1, hi)
+        if a < b:
+            diff[a - lo] += 1
+            diff[b - lo] -= 1
+    coverage = list(accumulate(diff[:-1]))
+    floor = min(coverage)
+
+    # Pick the least-covered run nearest the centre; normally that is a run with no characters at all
+    best, best_dist, start = None, None, None
+    centre = width / 2
+    for x, count in enumerate(coverage + [floor + 1]):
+        if count == floor and start is None:
+            start = x
+        elif count != floor and start is not None:
+            run_lo, run_hi = lo + start, lo + x
+            dist = 0 if run_lo <= centre <= run_hi else min(abs(centre - run_lo), abs(centre - run_hi))
+            if best_dist is None or dist < best_dist: best, best_dist = (run_lo, run_hi), dist
+            start = None
+    if best[0] <= centre <= best[1]: return centre
+    return (best[0] + best[1]) / 2
+
+
+def column_text(chars, bbox):
+    # Same textmap settings pdfplumber uses for page.crop(bbox).extract_text()
+    return chars_to_textmap(chars, layout_bbox=bbox, layout_width=bbox[2] - bbox[0], layout_height=bbox[3] - bbox[1]).as_string
+
+
+def page_chars(page, trace=None, fast=None):
+    if fast is None: fast = FAST_EXTRACTION
+    if fast:
+        try:
+            chars = fast_page_chars(page)
+            if trace: trace.count("fastpath.pages")
+            return chars
+        except Exception as e:
+            # Unsupported layout (e.g. rotated text) or a pdfminer error; page.chars either works or raises the real error
+            if trace:
+                trace.count("fastpath.fallback")
+                trace.sample("fastpath.fallback", f"page {page.page_number}: {type(e).__name__}: {e}")
+    return page.chars
+
+
+def extract_columns(page, trace=None, fast=None):
+    # One pass over the page's chars, split at the detected gutter, instead of two cropped pages
+    load_pdfplumber()
+    stage = trace.stage if trace else no_stage
+    with stage("chars", page=page.page_number):
+        chars = page_chars(page, trace, fast)
+    with stage("gutter", page=page.page_number):
+        gutter = find_gutter(chars, page.width)
+        left, right = [], []
+        for ch in chars:
+            (left if ch["x0"] + ch["x1"] < 2 * gutter else right).append(ch)
+    with stage("textmap", page=page.page_number):
+        return column_text(left, (0, 0, gutter, page.height)), column_text(right, (gutter, 0, page.width, page.height))
+
+
+# Dynamic Chronological Sort
+def get_chronological_rank(sem_str):
+    # Extract year (e.g. 2022 from 2022-2023)
+    year_match = re.search(r'(\d{4})', sem_str)
+    year = int(year_match.group(1)) if year_match else 0
+
+    # Rank seasons: Güz < Bahar < Yaz
+    rank = 0
+    if "Güz" in sem_str: rank = 1
+    elif "Bahar" in sem_str: rank = 2
+    elif "Yaz" in sem_str: rank = 3
+
+    return (year * 10) + rank
+
+
+def term_id(sem_str):
+    # get_chronological_rank runs once per distinct semester string; later lookups are a dict hit
+    term = TERM_IDS.get(sem_str)
+    if term is None:
+        if len(TERM_IDS) >= MAX_TERM_IDS: del TERM_IDS[next(iter(TERM_IDS))]
+        term = TERM_IDS[sem_str] = get_chronological_rank(sem_str)
+    return term
+
+
+def tokenize_column(text, trace=None):
+    # Classify every non-empty line once; yields (kind, match-or-line). With a trace, the pattern that classified
+    # each line is counted as regex.<pattern> and boilerplate lines by reason.
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line: continue
+
+        sem_match = SEMESTER_PATTERN.search(line)
+        if sem_match:
+            if trace: trace.count("regex.semester")
+            yield SEMESTER, sem_match
+            continue
+
+        course_match = COURSE_PATTERN.match(line)
+        if course_match:
+            if trace: trace.count("regex.course")
+            yield COURSE, course_match
+        elif (len(line) < 2 or line in GRADE_POINTS or line in GPA_EXCLUDED_GRADES
+              or SYSTEM_TEXT_PATTERN.search(line) or NEW_COURSE_PATTERN.match(line) or NEW_SEMESTER_PATTERN.search(line)):
+            # System text, unmatched course/semester starts and floating grades are never merged
+            if trace:
+                reason = boilerplate_reason(line)
+                trace.count("boilerplate." + reason)
+                trace.sample("boilerplate." + reason, line)
+                if reason in PATTERN_REASONS: trace.count("regex." + reason)
+            yield BOILERPLATE, line
+        else:
+            yield CONTINUATION, line
+
+
+def looks_like_transcript(text):
+    # Every UBYS page carries a semester header, system text (footer, column titles) or the student number
+    return bool(SEMESTER_PATTERN.search(text) or SYSTEM_TEXT_PATTERN.search(text) or STUDENT_ID_PATTERN.search(text))
+
+
+# Boilerplate reasons that come from a pattern match (the others are plain string checks)
+PATTERN_REASONS = ("system_text", "new_course", "new_semester")
+
+
+def boilerplate_reason(line):
+    # Which tokenize_column check classified a line as boilerplate (only evaluated when tracing)
+    if len(line) < 2: return "short_line"
+    if line in GRADE_POINTS or line in GPA_EXCLUDED_GRADES: return "floating_grade"
+    if SYSTEM_TEXT_PATTERN.search(line): return "system_text"
+    if NEW_COURSE_PATTERN.match(line): return "new_course"
+    return "new_semester"
+
+
+def strip_noise(name, patterns, trace=None, counter=None):
+    if trace:
+        for p in patterns:
+            name, hits = p.subn('', name)
+            if hits: trace.count(counter)
+            name = name.strip()
+        return name
+    for p in patterns:
+        name = p.sub('', name).strip()
+    return name
+
+
+def clean_course_name(name, trace=None):
+    # Targeted noise removal from name
+    return strip_noise(name, COURSE_NAME_NOISE, trace, "regex.name_noise")
+
+
+def process_column(text, trace=None):
+    result = []
+    # The term id is interned once per semester header and carried on the section
+    current_semester, current_term, current_courses = None, None, []
+
+    for kind, token in tokenize_column(text, trace):
+        if trace:
+            trace.count("lines." + kind)
+            if kind == COURSE and not current_semester:
+                trace.count("skipped.before_semester")
+                trace.sample("skipped.before_semester", token.group(0))
+        if kind == SEMESTER:
+            if current_semester and current_courses: result.append({"semester": current_semester, "term": current_term, "courses": current_courses})
+            current_semester, current_courses = token.group(1), []
+            current_term = term_id(current_semester)
+        elif not current_semester or kind == BOILERPLATE:
+            continue
+        elif kind == COURSE:
+            current_courses.append({
+                "semester": current_semester,
+                "code": token.group(1).strip(),
+                "name": clean_course_name(token.group(2).strip(), trace),
+                "credits": int(token.group(3)),
+                "grade": token.group(4)
+            })
+        elif current_courses:
+            # Continuation line: belongs to the previous course name
+            last = current_courses[-1]
+            last["name"] = strip_noise((last["name"] + " " + token).strip(), CONTINUATION_NOISE, trace, "regex.continuation_noise")
+            if trace:
+                trace.count("continuation.merged")
+                trace.sample("continuation.merged", token)
+
+    if current_semester and current_courses: result.append({"semester": current_semester, "term": current_term, "courses": current_courses})
+
+    # Final formatting Pass
+    for sec in result:
+        for c in sec["courses"]:
+            # Polish name items
+            c["name"] = FINAL_NAME_TRUNCATE.sub('', c["name"]).strip()
+            c["name"] = FINAL_ERASMUS_SUFFIX.sub('', c["name"]).strip()
+            if "(" in c["code"]:
+                # Unified code format
+                c["code"] = CODE_ERASMUS_PATTERN.sub('(Erasmus)', c["code"]).strip()
+                # Remove common duplicate artifacts in code
+                c["code"] = CODE_PAREN_PATTERN.sub(r' (\1)', c["code"])
+    return result
+
+
+def calculate_gpa(courses):
+    # Returns (gpa, credits); gpa is None when no graded credits exist
+    p, k = 0, 0
+    for c in courses:
+        if c["grade"] not in GPA_EXCLUDED_GRADES:
+            p += (c["credits"] * GRADE_POINTS.get(c["grade"], 0))
+            k += c["credits"]
+    return (p / k if k > 0 else None), k
+
+
+class GpaAggregator:
+    # Running quality-point/credit totals (overall and per semester); add/remove/replace are O(1)
+    def __init__(self, courses=()):
+        self.points, self.credits = 0.0, 0
+        self.semesters = {}
+        for c in courses: self.add(c)
+
+    def apply(self, c, sign):
+        if c["grade"] in GPA_EXCLUDED_GRADES: return
+        points = c["credits"] * GRADE_POINTS.get(c["grade"], 0)
+        self.points += sign * points
+        self.credits += sign * c["credits"]
+        subtotal = self.semesters.setdefault(c["semester"], [0.0, 0])
+        subtotal[0] += sign * points
+        subtotal[1] += sign * c["credits"]
+        if subtotal[1] == 0 and subtotal[0] == 0: del self.semesters[c["semester"]]
+
+    def add(self, course):
+        self.apply(course, 1)
+
+    def remove(self, course):
+        self.apply(course, -1)
+
+    def replace(self, old, new):
+        self.apply(old, -1)
+        self.apply(new, 1)
+
+    def gpa(self):
+        return self.points / self.credits if self.credits > 0 else None
+
+    def semester_gpa(self, semester):
+        points, credits = self.semesters.get(semester, (0.0, 0))
+        return points / credits if credits > 0 else None
+
+
+def load_courses(filepath, cache=None, warnings=None, meta=None, on_section=None, progress=None, trace=None):
+    # parse_pdf with an optional ParseCache in front; a hit never touches pdfplumber (nor the callbacks)
+    if warnings is None: warnings = []
+    if meta is None: meta = {}
+    if cache is None: return parse_pdf(filepath, warnings, meta, on_section, progress, trace)
+
+    with (trace.stage("digest") if trace else NULL_STAGE):
+        digest = file_digest(filepath)
+        hit = cache.get(digest)
+    if trace: trace.count("cache.hit" if hit is not None else "cache.miss")
+    if hit is not None:
+        warnings.extend(hit["warnings"])
+        meta.update(hit["meta"])
+        return hit["courses"]
+
+    courses = parse_pdf(filepath, warnings, meta, on_section, progress, trace)
+    cache.put(digest, {"courses": courses, "warnings": warnings, "meta": meta})
+    return courses
+
+
+def parse_transcript(filepath, cache=None, trace=None, name=None):
+    # One self-contained record per file; never raises so batch runs survive corrupt PDFs
+    # gpa counts the last attempt of each course, gpa_all_attempts every attempt listed in retakes.
+    # filepath may also be a binary file object (e.g. an upload in memory, without a cache); name then labels the record.
+    name = name or filepath
+    record = {"file": name, "student_id": None, "gpa": None, "gpa_all_attempts": None, "credits": 0, "courses": [], "retakes": {}, "warnings": [], "error": None}
+    try:
+        meta = {}
+        record["courses"] = load_courses(filepath, cache, record["warnings"], meta, trace=trace)
+        record["student_id"] = meta.get("student_id") or os.path.splitext(os.path.basename(name))[0]
+        gpa, credits = calculate_gpa(record["courses"])
+        record["gpa"] = round(gpa, 2) if gpa is not None else None
+        record["credits"] = credits
+        record["retakes"] = meta.get("retakes", {})
+        gpa_all, _ = all_attempts_gpa(record["courses"], record["retakes"])
+        record["gpa_all_attempts"] = round(gpa_all, 2) if gpa_all is not None else None
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+class BackgroundParse:
+    # Runs load_courses on a worker thread. The owner drains .events from its own loop (Tk uses after()):
+    # ("progress", page_no, page_count), ("section", section), ("done", courses, meta), ("cancelled",), ("error", message)
+    def __init__(self, filepath, cache=None):
+        self.events = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, args=(filepath, cache), daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def progress(self, page_no, page_count):
+        if self.cancelled.is_set(): raise ParseCancelled()
+        self.events.put(("progress", page_no, page_count))
+
+    def run(self, filepath, cache):
+        try:
+            meta = {}
+            courses = load_courses(filepath, cache, meta=meta, on_section=lambda section: self.events.put(("section", section)), progress=self.progress)
+            self.events.put(("done", courses, meta))
+        except ParseCancelled:
+            self.events.put(("cancelled",))
+        except Exception as e:
+            self.events.put(("error", str(e)))
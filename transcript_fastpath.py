@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Transcript Fast Path - Lean pdfminer text extraction for UBYS print-to-PDF pages
+
+pdfplumber builds an LTChar object per glyph and then converts every one into a ~20-key dict (colours, font
+names, marked content, ...). The column splitter only needs text, position and orientation. This module runs
+pdfminer's own content-stream interpreter with a device that renders each text string straight into
+those minimal char dicts, using the same arithmetic as LTChar and pdfplumber, so the coordinates are identical.
+
+Only unrotated horizontal text is handled. Anything else raises FastPathUnsupported and the caller falls back to
+page.chars.
+"""
+
+from pdfminer import utils
+from pdfminer.pdfdevice import PDFTextDevice
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.pdfinterp import PDFPageInterpreter
+
+
+class FastPathUnsupported(Exception):
+    pass
+
+
+class CharDevice(PDFTextDevice):
+    # Collects pdfplumber-compatible char dicts (text, x0, x1, top, bottom, doctop, upright) for one page
+    def __init__(self, rsrcmgr, page):
+        super().__init__(rsrcmgr)
+        self.chars = []
+        self.glyphs = {}  # id(font) -> {cid: (text, width)}
+        self.height, self.doctop = page.height, page.initial_doctop
+        self.mb_x0, self.mb_top = page.mediabox[0], page.mediabox[1]
+
+    def render_string(self, textstate, seq, ncs, graphicstate):
+        font = textstate.font
+        if font.is_vertical(): raise FastPathUnsupported("vertical writing")
+        a, b, c, d, e, f = utils.mult_matrix(textstate.matrix, self.ctm)
+        if b or c: raise FastPathUnsupported("rotated or skewed text")
+
+        fontsize, scaling, rise = textstate.fontsize, textstate.scaling * 0.01, textstate.rise
+        charspace = textstate.charspace * scaling
+        wordspace = 0 if font.is_multibyte() else textstate.wordspace * scaling
+        dxscale = 0.001 * fontsize * scaling
+        descent = font.get_descent() * fontsize
+        upright = a * d * scaling > 0
+        glyphs = self.glyphs.get(id(font))
+        if glyphs is None: glyphs = self.glyphs[id(font)] = {}
+        height, doctop, mb_x0, mb_top = self.height, self.doctop, self.mb_x0, self.mb_top
+        append = self.chars.append
+
+        # Same walk as PDFTextDevice.render_string_horizontal; the glyph box is LTChar's
+        # (0, descent + rise, adv, descent + rise + fontsize) mapped through the unrotated text matrix
+        x, y = textstate.linematrix
+        needcharspace = False
+        for obj in seq:
+            if isinstance(obj, (int, float)):
+                x -= obj * dxscale
+                needcharspace = True
+            elif isinstance(obj, bytes):
+                for cid in font.decode(obj):
+                    if needcharspace: x += charspace
+                    glyph = glyphs.get(cid)
+                    if glyph is None:
+                        try:
+                            text = font.to_unichr(cid)
+                        except PDFUnicodeNotDefined:
+                            text = f"(cid:{cid})"
+                        glyph = glyphs[cid] = (text, font.char_width(cid))
+                    adv = glyph[1] * fontsize * scaling
+                    left, bottom = x * a + e, y * d + f
+                    x0, x1 = left, a * adv + left
+                    y0, y1 = d * (descent + rise) + bottom, d * (descent + rise + fontsize) + bottom
+                    if x1 < x0: x0, x1 = x1, x0
+                    if y1 < y0: y0, y1 = y1, y0
+                    top = (height - y1) + mb_top
+                    append({"text": glyph[0], "x0": x0 + mb_x0, "x1": x1 + mb_x0, "top": top, "bottom": (height - y0) + mb_top,
+                            "doctop": doctop + top, "upright": upright})
+                    x += adv
+                    if cid == 32 and wordspace: x += wordspace
+                    needcharspace = True
+        textstate.linematrix = (x, y)
+
+
+def page_chars(page):
+    # page is a pdfplumber Page; returns chars equivalent to page.chars for the keys the column splitter uses
+    device = CharDevice(page.pdf.rsrcmgr, page)
+    PDFPageInterpreter(page.pdf.rsrcmgr, device).process_page(page.page_obj)
+    return device.chars
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Transcript Scenarios - Columnar GPA engine with batched what-if evaluation
+"""
+
+from collections import namedtuple
+from itertools import product
+
+import numpy as np
+
+from transcript_engine import GRADE_POINTS, GPA_EXCLUDED_GRADES, term_id
+
+# Grade Code Table: every grade is stored as a small integer index into these arrays.
+# "" marks a course that is not taken (yet) in a scenario; UNKNOWN_GRADE catches anything else,
+# which calculate_gpa counts with 0 points.
+UNKNOWN_GRADE = "?"
+GRADE_CODES = list(GRADE_POINTS) + ["", UNKNOWN_GRADE]
+GRADE_INDEX = {g: i for i, g in enumerate(GRADE_CODES)}
+POINTS_TABLE = np.array([GRADE_POINTS.get(g, 0.0) for g in GRADE_CODES])
+COUNTED_TABLE = np.array([g not in GPA_EXCLUDED_GRADES for g in GRADE_CODES])
+NOT_TAKEN = GRADE_INDEX[""]
+
+# Rows evaluated per batch; bounds the size of the temporary (rows x courses) float matrices
+DEFAULT_CHUNK_ROWS = 65536
+
+ScenarioResult = namedtuple("ScenarioResult", ["gpa", "credits", "semester_gpa", "cumulative_gpa"])
+
+
+def grade_code(grade):
+    return GRADE_INDEX.get(grade, GRADE_INDEX[UNKNOWN_GRADE])
+
+
+class CourseColumns:
+    # One student's courses as parallel arrays; semesters are numbered chronologically
+    def __init__(self, courses):
+        self.codes = [c["code"] for c in courses]
+        self.semesters = sorted({c["semester"] for c in courses}, key=term_id)
+        semester_ids = {s: i for i, s in enumerate(self.semesters)}
+        self.credits = np.array([c["credits"] for c in courses], dtype=np.float64)
+        self.grades = np.array([grade_code(c["grade"]) for c in courses], dtype=np.int8)
+        self.semester_ids = np.array([semester_ids[c["semester"]] for c in courses], dtype=np.intp)
+        self.code_index = {code: i for i, code in enumerate(self.codes)}
+
+        # Course -> semester one-hot matrix, so per-semester sums become one matrix product
+        self.semester_matrix = np.zeros((len(courses), len(self.semesters)))
+        self.semester_matrix[np.arange(len(courses)), self.semester_ids] = 1.0
+
+    def __len__(self):
+        return len(self.codes)
+
+    def with_projected(self, courses):
+        # Copy with extra planned courses appended; their base grade is "not taken" until a scenario sets it
+        planned = [dict(c, grade="") for c in courses]
+        return CourseColumns(self.to_courses() + planned)
+
+    def to_courses(self):
+        return [{"semester": self.semesters[s], "code": code, "name": "", "credits": int(k), "grade": GRADE_CODES[g]}
+                for code, k, g, s in zip(self.codes, self.credits, self.grades, self.semester_ids)]
+
+    def gpa(self):
+        result = evaluate(self, self.grades[np.newaxis, :])
+        return None if np.isnan(result.gpa[0]) else float(result.gpa[0])
+
+
+def scenario_matrix(columns, scenarios):
+    # scenarios: iterable of {course code: grade} overrides -> (N, courses) grade code matrix
+    scenarios = list(scenarios)
+    matrix = np.repeat(columns.grades[np.newaxis, :], len(scenarios), axis=0)
+    for row, overrides in enumerate(scenarios):
+        for code, grade in overrides.items():
+            matrix[row, columns.code_index[code]] = grade_code(grade)
+    return matrix
+
+
+def enumerate_scenarios(columns, options):
+    # Every combination of the given grade options, e.g. {"MATH141": ["AA", "BB", "CC"], "PHYS121": [...]}
+    codes = list(options)
+    axes = [np.array([grade_code(g) for g in options[code]], dtype=np.int8) for code in codes]
+    matrix = np.repeat(columns.grades[np.newaxis, :], int(np.prod([len(a) for a in axes])), axis=0)
+    if not codes: return matrix, []
+    grids = np.meshgrid(*axes, indexing="ij")
+    for code, grid in zip(codes, grids):
+        matrix[:, columns.code_index[code]] = grid.ravel()
+    labels = list(product(*(options[code] for code in codes)))
+    return matrix, labels
+
+
+def evaluate(columns, grade_matrix, chunk_rows=DEFAULT_CHUNK_ROWS):
+    # grade_matrix: (N, courses) grade codes. Returns per-scenario overall GPA and credits, GPA of each
+    # semester (N, S) and cumulative GPA through each semester (N, S); NaN where no graded credits exist.
+    grade_matrix = np.asarray(grade_matrix)
+    n, s = grade_matrix.shape[0], len(columns.semesters)
+    gpa, credits = np.empty(n), np.empty(n)
+    semester_gpa, cumulative_gpa = np.empty((n, s)), np.empty((n, s))
+
+    for lo in range(0, n, chunk_rows):
+        block = grade_matrix[lo:lo + chunk_rows]
+        counted = COUNTED_TABLE[block] * columns.credits
+        points = POINTS_TABLE[block] * counted
+        sem_points = points @ columns.semester_matrix
+        sem_credits = counted @ columns.semester_matrix
+        cum_points, cum_credits = np.cumsum(sem_points, axis=1), np.cumsum(sem_credits, axis=1)
+
+        hi = lo + block.shape[0]
+        total_points, total_credits = points.sum(axis=1), counted.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            gpa[lo:hi] = np.where(total_credits > 0, total_points / total_credits, np.nan)
+            semester_gpa[lo:hi] = np.where(sem_credits > 0, sem_points / sem_credits, np.nan)
+            cumulative_gpa[lo:hi] = np.where(cum_credits > 0, cum_points / cum_credits, np.nan)
+        credits[lo:hi] = total_credits
+
+    return ScenarioResult(gpa, credits, semester_gpa, cumulative_gpa)
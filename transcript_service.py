@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+Transcript Service - Local HTTP/JSON API for transcript parsing and GPA calculation
+
+    POST /parse      PDF as the request body (Content-Type: application/pdf) or as a multipart/form-data file field.
+                     Returns the transcript_engine.parse_transcript record plus "digest", "cached" (served from
+                     the result cache) and "coalesced" (shared the parse of an identical upload in flight).
+    GET  /metrics    request counts, parse latency percentiles, queue depth and cache statistics
+    GET  /health
+
+Parsing runs on a process pool, so the event loop only moves bytes. Results are cached in memory by the SHA-256
+of the upload, and identical uploads that arrive while one is being parsed share that parse. Once max_pending
+parses are queued, or upload bodies in memory would exceed max_buffered bytes, further uploads get 503 with
+Retry-After before their body is read; connections beyond max_connections are turned away the same way.
+
+Usage:
+    python transcript_service.py --port 8765 -w 4
+    curl --data-binary @transcript.pdf -H "Content-Type: application/pdf" http://127.0.0.1:8765/parse
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from transcript_engine import load_pdfplumber, parse_transcript
+from transcript_trace import percentile
+
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 20 * 1024 * 1024
+MAX_BUFFERED_BYTES = 256 * 1024 * 1024
+MAX_CONNECTIONS = 1024
+MAX_HEADERS = 100
+READ_TIMEOUT = 30.0
+LATENCY_WINDOW = 10000
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 408: "Request Timeout",
+           411: "Length Required", 413: "Payload Too Large", 415: "Unsupported Media Type", 422: "Unprocessable Entity",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_upload(data, name):
+    # Runs in a pool process; pdfplumber reads the upload from memory, so no temp file is written
+    return parse_transcript(io.BytesIO(data), name=name)
+
+
+def multipart_file(body, content_type):
+    # First part of a multipart/form-data body that carries a filename (or the first part at all): (name, bytes)
+    boundary = None
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "boundary": boundary = value.strip('"')
+    if not boundary: raise HttpError(400, "multipart body without boundary")
+
+    parts = []
+    for chunk in body.split(b"--" + boundary.encode("latin-1"))[1:]:
+        if chunk.startswith(b"--"): break
+        head, sep, content = chunk.partition(b"\r\n\r\n")
+        if not sep: continue
+        disposition = next((l for l in head.decode("utf-8", "replace").split("\r\n") if l.lower().startswith("content-disposition")), "")
+        filename = None
+        for param in disposition.split(";")[1:]:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "filename": filename = value.strip('"')
+        parts.append((filename, content[:-2] if content.endswith(b"\r\n") else content))
+    if not parts: raise HttpError(400, "multipart body without parts")
+    return next((p for p in parts if p[0]), parts[0])
+
+
+class TranscriptService:
+    def __init__(self, workers=None, max_pending=512, cache_entries=1024, max_body=MAX_BODY_BYTES,
+                 max_buffered=MAX_BUFFERED_BYTES, max_connections=MAX_CONNECTIONS):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending, self.cache_entries, self.max_body = max_pending, cache_entries, max_body
+        self.max_buffered, self.max_connections = max_buffered, max_connections
+        self.pool = self.new_pool()
+        self.results = OrderedDict()  # digest -> record, least recently used first
+        self.in_flight = {}           # digest -> asyncio.Future shared by identical uploads
+        self.pending = 0
+        self.buffered = 0             # bytes of request bodies being read or waiting on a parse
+        self.connections = 0
+        self.started = time.time()
+        self.statuses = Counter()
+        self.counters = Counter()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)        # whole /parse requests (ms)
+        self.parse_latencies = deque(maxlen=LATENCY_WINDOW)  # pool round trips of actual parses (ms)
+
+    def new_pool(self):
+        # Workers are started lazily, i.e. while client sockets are open. Forked children would inherit those sockets
+        # and keep closed connections half-open, so they come from a fork server (or are spawned) instead.
+        # They import pdfplumber up front so the first requests do not pay for it.
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method), initializer=load_pdfplumber)
+
+    # Parsing
+    async def parse(self, data, name):
+        digest = hashlib.sha256(data).hexdigest()
+        record = self.results.get(digest)
+        if record is not None:
+            self.results.move_to_end(digest)
+            self.counters["cache_hits"] += 1
+            return dict(record, file=name), digest, "cache"
+
+        future = self.in_flight.get(digest)
+        if future is not None:
+            self.counters["coalesced"] += 1
+            return dict(await asyncio.shield(future), file=name), digest, "coalesced"
+        self.check_queue()
+
+        self.counters["cache_misses"] += 1
+        future = self.in_flight[digest] = asyncio.get_running_loop().create_future()
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            record = await asyncio.get_running_loop().run_in_executor(self.pool, parse_upload, data, name)
+        except (Exception, asyncio.CancelledError) as e:
+            if isinstance(e, BrokenProcessPool):
+                # A worker died (e.g. out of memory); replace the pool so later requests still work
+                self.pool.shutdown(wait=False)
+                self.pool = self.new_pool()
+            # Identical uploads waiting on this parse get the error too, also when this request is cancelled
+            cancelled = isinstance(e, asyncio.CancelledError)
+            error = HttpError(503, "parse was cancelled, try again") if cancelled else HttpError(500, f"parser failed: {type(e).__name__}")
+            future.set_exception(error)
+            future.exception()  # retrieved here, so no warning when no identical upload was waiting
+            if cancelled: raise
+            raise error from e
+        finally:
+            self.pending -= 1
+            del self.in_flight[digest]
+        self.parse_latencies.append((time.perf_counter() - start) * 1000)
+
+        if not record["error"]:
+            self.results[digest] = record
+            while len(self.results) > self.cache_entries: self.results.popitem(last=False)
+        future.set_result(record)
+        return record, digest, "parsed"
+
+    def check_queue(self, length=0):
+        # Raised before an upload is read (length = its Content-Length) and again before its parse is queued
+        if self.pending >= self.max_pending:
+            self.counters["rejected"] += 1
+            raise HttpError(503, f"{self.pending} parses queued, try again later")
+        if self.buffered + length > self.max_buffered:
+            self.counters["rejected"] += 1
+            raise HttpError(503, f"{self.buffered} bytes of uploads in memory, try again later")
+
+    # Endpoints
+    async def dispatch(self, method, path, headers, body):
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/metrics":
+            if method != "GET": raise HttpError(405, "use GET")
+            return 200, self.metrics()
+        if path != "/parse": raise HttpError(404, f"no route {path}")
+        if method != "POST": raise HttpError(405, "use POST")
+
+        content_type = headers.get("content-type", "application/pdf")
+        name = headers.get("x-filename", "upload.pdf")
+        if content_type.lower().startswith("multipart/form-data"):
+            filename, body = multipart_file(body, content_type)
+            name = filename or name
+        elif not content_type.lower().startswith(("application/pdf", "application/octet-stream")):
+            raise HttpError(415, "send application/pdf or multipart/form-data")
+        if not body: raise HttpError(400, "empty upload")
+
+        start = time.perf_counter()
+        record, digest, source = await self.parse(body, name)
+        self.latencies.append((time.perf_counter() - start) * 1000)
+        return (422 if record["error"] else 200), dict(record, digest=digest, cached=source == "cache", coalesced=source == "coalesced")
+
+    def metrics(self):
+        def latency(values):
+            values = sorted(values)
+            return {"count": len(values), "p50_ms": percentile(values, 50), "p90_ms": percentile(values, 90),
+                    "p99_ms": percentile(values, 99), "max_ms": values[-1] if values else None}
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "responses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "parse_requests": latency(self.latencies),
+            "parses": latency(self.parse_latencies),
+            "queue": {"pending": self.pending, "max_pending": self.max_pending, "workers": self.workers,
+                      "buffered_bytes": self.buffered, "max_buffered_bytes": self.max_buffered,
+                      "connections": self.connections, "max_connections": self.max_connections},
+            "cache": {"entries": len(self.results), "max_entries": self.cache_entries, "hits": self.counters["cache_hits"],
+                      "misses": self.counters["cache_misses"], "coalesced": self.counters["coalesced"]},
+            "rejected": self.counters["rejected"],
+        }
+
+    # HTTP/1.1
+    async def read_request(self, reader):
+        # (method, path, headers, body), or None when the client closed the connection between requests
+        line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+        if not line: return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(400, "malformed request line")
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+            if line in (b"\r\n", b"\n", b""): break
+            if len(headers) >= MAX_HEADERS: raise HttpError(400, "too many headers")
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        headers["http-version"] = version
+
+        if "chunked" in headers.get("transfer-encoding", "").lower(): raise HttpError(411, "send Content-Length")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HttpError(400, "bad Content-Length")
+        if length > self.max_body: raise HttpError(413, f"upload larger than {self.max_body} bytes")
+        if not length: return method.upper(), target.split("?", 1)[0], headers, b""
+        # Nothing is buffered for an upload that would be rejected anyway; the handler releases the bytes reserved here
+        self.check_queue(length)
+        self.buffered += length
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), READ_TIMEOUT)
+        except BaseException:
+            self.buffered -= length
+            raise
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def respond(self, writer, status, payload, keep_alive):
+        self.statuses[status] += 1
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(body)}", "Connection: " + ("keep-alive" if keep_alive else "close")]
+        if status == 503: head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        if self.connections >= self.max_connections:
+            self.counters["rejected"] += 1
+            try:
+                await self.respond(writer, 503, {"error": f"{self.connections} connections open, try again later"}, False)
+            except ConnectionError:
+                pass
+            writer.close()
+            return
+        self.connections += 1
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self.read_request(reader)
+                    if request is None: break
+                    method, path, headers, body = request
+                    keep_alive = headers["http-version"] == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                    try:
+                        status, payload = await self.dispatch(method, path, headers, body)
+                    finally:
+                        self.buffered -= len(body)
+                except HttpError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except asyncio.TimeoutError:
+                    status, payload = 408, {"error": "request timed out"}
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive: break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def serve(self, host, port):
+        # backlog sized for bursts of a few hundred simultaneous uploads
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        print(f"Serving on http://{host}:{port} with {self.workers} worker(s)", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve transcript parsing and GPA calculation over local HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="bind address (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-w", "--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    parser.add_argument("--max-pending", type=int, default=512, help="queued parses before uploads get 503")
+    parser.add_argument("--cache-entries", type=int, default=1024, help="parsed results kept in memory by content hash")
+    parser.add_argument("--max-body", type=int, default=MAX_BODY_BYTES, help="largest accepted upload in bytes")
+    parser.add_argument("--max-buffered", type=int, default=MAX_BUFFERED_BYTES, help="upload bytes held in memory before uploads get 503")
+    parser.add_argument("--max-connections", type=int, default=MAX_CONNECTIONS, help="open connections before new ones get 503")
+    args = parser.parse_args(argv)
+
+    service = TranscriptService(args.workers, args.max_pending, args.cache_entries, args.max_body, args.max_buffered, args.max_connections)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
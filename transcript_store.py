@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Transcript Store - Local SQLite store for ingested transcripts, saved sessions and per-student GPA history
+"""
+
+import os
+import sqlite3
+import time
+from itertools import groupby
+
+from transcript_engine import GRADE_POINTS, GPA_EXCLUDED_GRADES
+
+COURSE_FIELDS = ("semester", "code", "name", "credits", "grade")
+
+
+def default_store_path():
+    # Sessions are user data, not cache: %APPDATA% on Windows, XDG_DATA_HOME (~/.local/share) elsewhere
+    base = os.environ.get("APPDATA") or os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "iyte-transcript-calculator", "transcripts.sqlite3")
+
+
+class Course:
+    # Compact course record without a per-instance __dict__. Item access (course["grade"], dict(course)) keeps it
+    # interchangeable with the parser's course dicts, so the engine and table code work on either.
+    __slots__ = COURSE_FIELDS
+
+    def __init__(self, semester, code, name, credits, grade):
+        self.semester, self.code, self.name, self.credits, self.grade = semester, code, name, credits, grade
+
+    @classmethod
+    def from_dict(cls, c):
+        return cls(c["semester"], c["code"], c["name"], c["credits"], c["grade"])
+
+    def __getitem__(self, key):
+        if key not in COURSE_FIELDS: raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in COURSE_FIELDS: raise KeyError(key)
+        setattr(self, key, value)
+
+    def keys(self):
+        return COURSE_FIELDS
+
+    def to_dict(self):
+        return {f: getattr(self, f) for f in COURSE_FIELDS}
+
+    def __repr__(self):
+        return f"Course({self.semester!r}, {self.code!r}, {self.name!r}, {self.credits!r}, {self.grade!r})"
+
+
+# Session kinds: "saved" sessions are course lists edited and saved from the app; "ingested" sessions hold parsed
+# transcripts (watch mode), one per file. Cross-transcript queries read only courses flagged current, i.e. those of
+# each student's latest ingested session, so app saves and re-ingested copies are never counted twice.
+SAVED, INGESTED = "saved", "ingested"
+SCHEMA_VERSION = 2
+
+
+class TranscriptStore:
+    # Single-writer store; open one instance per process/thread that writes
+    def __init__(self, path=None):
+        self.path = path or default_store_path()
+        if self.path != ":memory:": os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL,
+                    digest TEXT NOT NULL, student_id TEXT, parsed_at REAL NOT NULL, error TEXT);
+                CREATE TABLE IF NOT EXISTS gpa_history (
+                    id INTEGER PRIMARY KEY, student_id TEXT NOT NULL, path TEXT NOT NULL, digest TEXT NOT NULL,
+                    gpa REAL, credits INTEGER NOT NULL, course_count INTEGER NOT NULL, recorded_at REAL NOT NULL);
+                CREATE INDEX IF NOT EXISTS gpa_history_student ON gpa_history (student_id, recorded_at);
+
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id INTEGER PRIMARY KEY, name TEXT NOT NULL, student_id TEXT, source TEXT, saved_at REAL NOT NULL,
+                    kind TEXT NOT NULL DEFAULT 'saved');
+                CREATE TABLE IF NOT EXISTS courses (
+                    id INTEGER PRIMARY KEY, session_id INTEGER NOT NULL, position INTEGER NOT NULL, student_id TEXT,
+                    semester TEXT NOT NULL, code TEXT NOT NULL, name TEXT NOT NULL, credits INTEGER NOT NULL, grade TEXT NOT NULL,
+                    current INTEGER NOT NULL DEFAULT 0);
+
+                CREATE TABLE IF NOT EXISTS grade_points (grade TEXT PRIMARY KEY, points REAL NOT NULL, counted INTEGER NOT NULL);
+            """)
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION: self.migrate()
+            self.conn.executescript("""
+                CREATE INDEX IF NOT EXISTS sessions_ingested ON sessions (source) WHERE kind = 'ingested';
+                CREATE INDEX IF NOT EXISTS sessions_student ON sessions (student_id, saved_at) WHERE kind = 'ingested';
+                CREATE INDEX IF NOT EXISTS courses_session ON courses (session_id, position);
+                CREATE INDEX IF NOT EXISTS courses_student ON courses (student_id);
+                CREATE INDEX IF NOT EXISTS courses_semester ON courses (semester);
+                CREATE INDEX IF NOT EXISTS courses_code ON courses (code, grade) WHERE current;
+                CREATE INDEX IF NOT EXISTS courses_grade ON courses (grade);
+                CREATE INDEX IF NOT EXISTS courses_term ON courses (code, semester, grade, credits) WHERE current;
+            """)
+            # Kept in sync with the engine's scale so averages can be computed inside SQLite
+            self.conn.executemany("INSERT OR REPLACE INTO grade_points VALUES (?, ?, ?)",
+                                  [(g, GRADE_POINTS.get(g, 0.0), g not in GPA_EXCLUDED_GRADES) for g in set(GRADE_POINTS) | GPA_EXCLUDED_GRADES])
+
+    def migrate(self):
+        # Version 1 kept app saves and ingested transcripts in one pool: sessions whose source is an ingested
+        # file become "ingested" sessions, and the indexes that now only cover current courses are rebuilt
+        columns = {r[1] for r in self.conn.execute("PRAGMA table_info(sessions)")}
+        if "kind" not in columns:
+            self.conn.execute("ALTER TABLE sessions ADD COLUMN kind TEXT NOT NULL DEFAULT 'saved'")
+            self.conn.execute("ALTER TABLE courses ADD COLUMN current INTEGER NOT NULL DEFAULT 0")
+            self.conn.execute("UPDATE sessions SET kind = 'ingested' WHERE source IN (SELECT path FROM files)")
+            for index in ("sessions_source", "courses_code", "courses_term"): self.conn.execute(f"DROP INDEX IF EXISTS {index}")
+            for (student_id,) in self.conn.execute("SELECT DISTINCT student_id FROM sessions WHERE kind = 'ingested'").fetchall():
+                self.refresh_current(student_id)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def file_state(self, path):
+        # (mtime_ns, size, digest) of the last ingested version, or None
+        return self.conn.execute("SELECT mtime_ns, size, digest FROM files WHERE path = ?", (path,)).fetchone()
+
+    def touch_file(self, path, mtime_ns, size):
+        # Same content under a new mtime (e.g. re-exported or copied again): remember it so the hash is not recomputed
+        with self.conn:
+            self.conn.execute("UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?", (mtime_ns, size, path))
+
+    def record_result(self, record, mtime_ns, size, digest):
+        # record is a transcript_engine.parse_transcript() result; its courses replace the file's previous ingested session
+        now = time.time()
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                              (record["file"], mtime_ns, size, digest, record["student_id"], now, record["error"]))
+            if not record["error"]:
+                self.conn.execute("INSERT INTO gpa_history (student_id, path, digest, gpa, credits, course_count, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                  (record["student_id"], record["file"], digest, record["gpa"], record["credits"], len(record["courses"]), now))
+                previous = self.conn.execute("SELECT id, student_id FROM sessions WHERE kind = 'ingested' AND source = ?", (record["file"],)).fetchone()
+                self.write_session(record["courses"], os.path.basename(record["file"]), record["student_id"], record["file"],
+                                   previous[0] if previous else None, now, INGESTED)
+                self.refresh_current(record["student_id"])
+                # The file may now belong to another student (a different transcript saved under the same name)
+                if previous and previous[1] != record["student_id"]: self.refresh_current(previous[1])
+
+    def refresh_current(self, student_id):
+        # Flags the courses of the student's latest ingested session as current and clears the older copies
+        latest = self.conn.execute("SELECT id FROM sessions WHERE kind = 'ingested' AND student_id IS ? ORDER BY saved_at DESC, id DESC LIMIT 1",
+                                   (student_id,)).fetchone()
+        self.conn.execute("""UPDATE courses SET current = (session_id IS ?)
+                             WHERE session_id IN (SELECT id FROM sessions WHERE kind = 'ingested' AND student_id IS ?)""",
+                          (latest[0] if latest else None, student_id))
+
+    def gpa_history(self, student_id):
+        rows = self.conn.execute("SELECT recorded_at, gpa, credits, course_count, path FROM gpa_history WHERE student_id = ? ORDER BY recorded_at", (student_id,))
+        return [{"recorded_at": r[0], "gpa": r[1], "credits": r[2], "course_count": r[3], "file": r[4]} for r in rows]
+
+    # Sessions
+    def save_session(self, courses, name, student_id=None, source=None, session_id=None):
+        # Overwrites session_id if it is a saved session, otherwise (None, or an opened ingested transcript) creates
+        # a new saved session; returns the id. Saved sessions never enter the cross-transcript queries.
+        if session_id is not None:
+            row = self.conn.execute("SELECT kind FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if not row or row[0] != SAVED: session_id = None
+        with self.conn:
+            return self.write_session(courses, name, student_id, source, session_id, time.time(), SAVED)
+
+    def write_session(self, courses, name, student_id, source, session_id, now, kind):
+        if session_id is None:
+            session_id = self.conn.execute("INSERT INTO sessions (name, student_id, source, saved_at, kind) VALUES (?, ?, ?, ?, ?)",
+                                           (name, student_id, source, now, kind)).lastrowid
+        else:
+            self.conn.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)", (session_id, name, student_id, source, now, kind))
+            self.conn.execute("DELETE FROM courses WHERE session_id = ?", (session_id,))
+        self.conn.executemany("INSERT INTO courses (session_id, position, student_id, semester, code, name, credits, grade) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                              [(session_id, i, student_id, c["semester"], c["code"], c["name"], c["credits"], c["grade"]) for i, c in enumerate(courses)])
+        return session_id
+
+    def sessions(self):
+        rows = self.conn.execute("""SELECT s.id, s.name, s.student_id, s.source, s.saved_at, s.kind, COUNT(c.id) FROM sessions s
+                                    LEFT JOIN courses c ON c.session_id = s.id GROUP BY s.id ORDER BY s.saved_at DESC""")
+        return [{"id": r[0], "name": r[1], "student_id": r[2], "source": r[3], "saved_at": r[4], "kind": r[5], "course_count": r[6]} for r in rows]
+
+    def load_session(self, session_id):
+        rows = self.conn.execute("SELECT semester, code, name, credits, grade FROM courses WHERE session_id = ? ORDER BY position", (session_id,))
+        return [Course(*r) for r in rows]
+
+    def delete_session(self, session_id):
+        with self.conn:
+            row = self.conn.execute("SELECT kind, student_id FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            self.conn.execute("DELETE FROM courses WHERE session_id = ?", (session_id,))
+            self.conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            # An older ingested copy of the same student becomes current again
+            if row and row[0] == INGESTED: self.refresh_current(row[1])
+
+    # Cross-transcript queries; all of them read only current courses (each student's latest ingested transcript)
+    def student_courses(self):
+        # Yields (student_id, courses) per ingested student, e.g. to build a Cohort
+        rows = self.conn.execute("SELECT student_id, semester, code, name, credits, grade FROM courses WHERE current ORDER BY student_id, session_id, position")
+        for student_id, group in groupby(rows, key=lambda r: r[0]):
+            yield student_id, [Course(*r[1:]) for r in group]
+
+    def students_with_grade(self, code, grade):
+        # e.g. students_with_grade("MATH141", "FF"); served by the partial (code, grade) index
+        rows = self.conn.execute("SELECT DISTINCT student_id FROM courses WHERE current AND code = ? AND grade = ? ORDER BY student_id", (code, grade))
+        return [r[0] for r in rows]
+
+    def course_term_averages(self, code=None):
+        # Credit-weighted average grade point per (course, semester); unknown grades count as 0 like calculate_gpa
+        where, params = ("AND c.code = ?", (code,)) if code else ("", ())
+        rows = self.conn.execute(f"""SELECT c.code, c.semester, SUM(COALESCE(g.points, 0) * c.credits) * 1.0 / SUM(c.credits), COUNT(*)
+                                     FROM courses c LEFT JOIN grade_points g ON g.grade = c.grade
+                                     WHERE c.current AND COALESCE(g.counted, 1) {where} GROUP BY c.code, c.semester HAVING SUM(c.credits) > 0""", params)
+        return [{"code": r[0], "semester": r[1], "average": r[2], "attempts": r[3]} for r in rows]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Transcript Trace - Opt-in parser instrumentation with JSON / Chrome trace export
+
+Pass a ParseTrace as trace= to transcript_engine.parse_pdf, load_courses or parse_transcript. It records a span
+per stage (open, chars, gutter, textmap, tokenize, resolve, digest) and counters:
+    lines.<kind>            lines classified as semester / course / continuation / boilerplate
+    boilerplate.<reason>    which check dropped a line (system_text, new_course, new_semester, floating_grade, short_line)
+    regex.<pattern>         lines classified by a pattern (semester, course, system_text, new_course, new_semester)
+                            and name/continuation noise substitutions that changed a course name (name_noise,
+                            continuation_noise)
+    continuation.merged     lines appended to the previous course name
+    skipped.before_semester course-like lines seen before any semester header
+The first few lines of every boilerplate/continuation category are kept as samples. Without a trace the engine
+only pays for a few "if trace" checks.
+
+Usage:
+    python transcript_trace.py transcript.pdf                        # summary JSON
+    python transcript_trace.py transcript.pdf --chrome -o trace.json # load in chrome://tracing or ui.perfetto.dev
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+
+# Lines kept per sample category
+SAMPLE_LINES = 20
+
+# Upper bucket bounds (ms) of the batch histograms
+HISTOGRAM_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+def percentile(sorted_values, p):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values: return None
+    return sorted_values[min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values))) - 1))]
+
+
+class ParseTrace:
+    def __init__(self, name=""):
+        self.name = name
+        self.origin = time.perf_counter()
+        self.spans = []  # (stage, start s, duration s, args)
+        self.counters = Counter()
+        self.samples = {}
+
+    @contextmanager
+    def stage(self, name, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((name, start - self.origin, time.perf_counter() - start, args))
+
+    def count(self, key, n=1):
+        self.counters[key] += n
+
+    def sample(self, category, line):
+        lines = self.samples.setdefault(category, [])
+        if len(lines) < SAMPLE_LINES: lines.append(line)
+
+    def stage_totals(self):
+        totals = {}
+        for name, _, duration, _ in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        return totals
+
+    def summary(self):
+        return {"file": self.name, "stages": self.stage_totals(), "counters": dict(self.counters), "samples": self.samples}
+
+    def chrome_trace(self):
+        # Trace Event Format: one complete ("X") event per span, counters as a final "C" event
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.name or "parse"}}]
+        end = 0.0
+        for name, start, duration, args in self.spans:
+            events.append({"name": name, "cat": "parse", "ph": "X", "ts": start * 1e6, "dur": duration * 1e6, "pid": pid, "tid": 0, "args": args})
+            end = max(end, start + duration)
+        if self.counters:
+            events.append({"name": "counters", "ph": "C", "ts": end * 1e6, "pid": pid, "tid": 0, "args": dict(self.counters)})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"file": self.name, "samples": self.samples}}
+
+
+class TraceHistogram:
+    # Aggregates ParseTrace.summary() dicts of a batch run: per-stage duration histograms and summed counters
+    def __init__(self):
+        self.files = 0
+        self.stages = {}
+        self.counters = Counter()
+
+    def add(self, summary):
+        self.files += 1
+        for name, seconds in summary["stages"].items():
+            self.stages.setdefault(name, []).append(seconds * 1000)
+        self.counters.update(summary["counters"])
+
+    def report(self):
+        stages = {}
+        for name, values in self.stages.items():
+            values = sorted(values)
+            buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+            for v in values:
+                buckets[bisect_left(HISTOGRAM_BUCKETS_MS, v)] += 1
+            labels = [f"<={b}ms" for b in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+            stages[name] = {
+                "files": len(values), "total_ms": sum(values),
+                "p50_ms": percentile(values, 50), "p90_ms": percentile(values, 90), "p99_ms": percentile(values, 99), "max_ms": values[-1],
+                "histogram": {label: n for label, n in zip(labels, buckets) if n},
+            }
+        return {"files": self.files, "stages": stages, "counters": dict(self.counters)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse one transcript PDF with instrumentation and export the trace.")
+    parser.add_argument("pdf")
+    parser.add_argument("--chrome", action="store_true", help="write Chrome trace format instead of the summary")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    from transcript_engine import parse_pdf
+    trace, warnings = ParseTrace(os.path.basename(args.pdf)), []
+    parse_pdf(args.pdf, warnings, trace=trace)
+    data = trace.chrome_trace() if args.chrome else dict(trace.summary(), warnings=warnings)
+
+    stream = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        json.dump(data, stream, ensure_ascii=False, indent=1)
+        stream.write("\n")
+    finally:
+        if stream is not sys.stdout: stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Transcript Watch - Ingest transcript PDFs dropped into a folder
+
+Watches a directory (inotify on Linux, polling elsewhere or on network shares), parses new or changed PDFs on a
+process pool and records each student's GPA history in a local SQLite store. Files whose mtime/size or content
+hash did not change are skipped; the hash is computed in the worker, next to the parse. New paths go through a
+bounded queue, so a burst of hundreds of files applies backpressure to the watcher instead of spawning unbounded
+work. When a worker process dies the pool is replaced and the files it held are retried one at a time, so only the
+file that crashes again is recorded as an error.
+
+Usage:
+    python transcript_watch.py /srv/advising/inbox --db advising.sqlite3 -w 4
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from transcript_cache import file_digest
+from transcript_engine import parse_transcript
+from transcript_store import TranscriptStore
+
+# inotify(7) constants
+IN_CLOSE_WRITE, IN_MOVED_TO, IN_Q_OVERFLOW = 0x00000008, 0x00000080, 0x00004000
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_pdf(name):
+    return name.lower().endswith(".pdf")
+
+
+def scan(directory):
+    # {path: (mtime_ns, size)} for every PDF directly inside directory
+    found = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and is_pdf(entry.name):
+                st = entry.stat()
+                found[entry.path] = (st.st_mtime_ns, st.st_size)
+    return found
+
+
+class PollingWatcher:
+    # Yields a path once its mtime/size has stayed the same for one interval (i.e. the copy has finished)
+    def __init__(self, directory, interval=2.0):
+        self.directory, self.interval = directory, interval
+
+    def __iter__(self):
+        seen, settling = {}, {}
+        while True:
+            now = time.time_ns()
+            for path, state in scan(self.directory).items():
+                if seen.get(path) == state: continue
+                if settling.get(path) == state or now - state[0] > self.interval * 1e9:
+                    settling.pop(path, None)
+                    seen[path] = state
+                    yield path
+                else:
+                    settling[path] = state
+            time.sleep(self.interval)
+
+
+class InotifyWatcher:
+    # Linux only; yields the existing PDFs first, then every PDF that is closed after writing or moved in
+    def __init__(self, directory):
+        self.directory = directory
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0: raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if self.libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def __iter__(self):
+        yield from scan(self.directory)
+        while True:
+            data, offset = os.read(self.fd, 64 * 1024), 0
+            while offset < len(data):
+                _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    # The kernel dropped events; fall back to a full listing, unchanged files are skipped later anyway
+                    yield from scan(self.directory)
+                elif is_pdf(os.fsdecode(name)):
+                    yield os.path.join(self.directory, os.fsdecode(name))
+
+
+def make_watcher(directory, interval, force_poll=False):
+    if not force_poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}); polling every {interval:g}s", file=sys.stderr)
+    return PollingWatcher(directory, interval)
+
+
+def feed(watcher, work, queued, lock):
+    # Watcher thread: put() blocks while the queue is full, which is the backpressure on bursts
+    for path in watcher:
+        with lock:
+            if path in queued: continue
+            queued.add(path)
+        work.put(path)
+
+
+def needs_parse(store, path):
+    # Returns (mtime_ns, size, previous digest or None) unless the file is gone or its mtime/size did not change;
+    # only a stat on the dispatch loop, the content hash is compared in the worker
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    previous = store.file_state(path)
+    if previous and previous[:2] == (st.st_mtime_ns, st.st_size): return None
+    return st.st_mtime_ns, st.st_size, previous[2] if previous else None
+
+
+def parse_if_changed(path, previous_digest):
+    # Runs in a pool process: (digest, record), with record None when the content is unchanged or the file vanished
+    try:
+        digest = file_digest(path)
+    except FileNotFoundError:
+        return None, None
+    if digest == previous_digest: return digest, None
+    return digest, parse_transcript(path)
+
+
+def error_record(path, message):
+    return {"file": path, "student_id": None, "gpa": None, "credits": 0, "courses": [], "error": message}
+
+
+def run(directory, db_path, workers=None, queue_size=64, interval=2.0, force_poll=False):
+    workers = workers or os.cpu_count() or 1
+    store = TranscriptStore(db_path)
+    work, queued, lock = queue.Queue(maxsize=queue_size), set(), threading.Lock()
+    watcher = make_watcher(directory, interval, force_poll)
+    threading.Thread(target=feed, args=(watcher, work, queued, lock), daemon=True).start()
+    print(f"Watching {directory} with {workers} worker(s) using {type(watcher).__name__}", file=sys.stderr)
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    in_flight, retry = {}, deque()  # future -> (path, mtime_ns, size, previous digest, suspect)
+    try:
+        while True:
+            broken = False
+            # Keep at most two files per worker in flight; everything else waits in the bounded queue
+            while len(in_flight) < workers * 2:
+                if retry:
+                    # Files of a crashed pool run alone, so a second crash points at the file that causes it
+                    if in_flight: break
+                    job = retry.popleft()
+                else:
+                    try:
+                        path = work.get(timeout=0.2 if not in_flight else 0)
+                    except queue.Empty:
+                        break
+                    with lock: queued.discard(path)
+                    state = needs_parse(store, path)
+                    if not state: continue
+                    job = (path,) + state + (False,)
+                try:
+                    in_flight[pool.submit(parse_if_changed, job[0], job[3])] = job
+                except BrokenProcessPool:
+                    # The pool broke after the futures seen so far completed normally
+                    retry.appendleft(job[:4] + (True,))
+                    broken = True
+                    break
+                if job[4]: break
+            if not in_flight and not broken: continue
+
+            done = wait(in_flight, timeout=0.5, return_when=FIRST_COMPLETED)[0] if in_flight else set()
+            if broken or any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+                # A worker died (e.g. out of memory) and the pool fails every job it still had; collect all of them
+                # before starting a fresh pool, so none is mistaken for a failure of the new one
+                done, _ = wait(in_flight)
+                pool.shutdown(wait=False)
+                pool = ProcessPoolExecutor(max_workers=workers)
+                print("Worker pool crashed; restarted", file=sys.stderr, flush=True)
+
+            for future in done:
+                job = in_flight.pop(future)
+                path, mtime_ns, size, _, suspect = job
+                try:
+                    digest, record = future.result()
+                except BrokenProcessPool:
+                    if not suspect:
+                        retry.append(job[:4] + (True,))
+                        continue
+                    digest, record = "", error_record(path, "worker process crashed")
+                except Exception as e:
+                    digest, record = "", error_record(path, f"{type(e).__name__}: {e}")
+                if digest is None: continue
+                if record is None:
+                    store.touch_file(path, mtime_ns, size)
+                    continue
+                store.record_result(record, mtime_ns, size, digest)
+                status = f"error: {record['error']}" if record["error"] else f"student {record['student_id']} GPA {record['gpa']}"
+                print(f"{os.path.basename(record['file'])}: {status}", file=sys.stderr, flush=True)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a folder and ingest transcript PDFs into a local GPA store.")
+    parser.add_argument("directory")
+    parser.add_argument("--db", default="transcripts.sqlite3", help="SQLite store (default: %(default)s)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--queue-size", type=int, default=64, help="pending files before the watcher is throttled")
+    parser.add_argument("--interval", type=float, default=2.0, help="polling interval in seconds")
+    parser.add_argument("--poll", action="store_true", help="always poll (e.g. for network shares inotify cannot see)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print(f"Not a directory: {args.directory}", file=sys.stderr)
+        return 1
+    try:
+        run(args.directory, args.db, args.workers, args.queue_size, args.interval, args.poll)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())